@@ -1,5 +1,9 @@
-from collections import deque
-from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext
+from functools import partial
+from itertools import count
+from pathlib import Path
+from threading import local
 from types import MappingProxyType
 
 import h5py
@@ -9,22 +13,146 @@ from nxstacker.experiment.tomoexpt import TomoExpt
 from nxstacker.io.nxtomo.metadata import MetadataPtycho
 from nxstacker.io.ptycho.ptypy import PtyPyFile
 from nxstacker.io.ptycho.ptyrex import PtyREXFile
-from nxstacker.utils.io import file_has_paths
-from nxstacker.utils.logger import create_logger
+from nxstacker.utils.io import available_cpus
 from nxstacker.utils.model import FixedValue
 from nxstacker.utils.parse import quote_iterable, unique_or_raise
 from nxstacker.utils.ptychography import (
-    phase_shift,
+    phase_median,
+    quantise_phase,
     remove_phase_ramp,
+    shift_wrapped_phase,
     unwrap_phase,
 )
 
 
+def _reuse_buffer(buffers, key, shape, dtype):
+    """Return a buffer of the shape and data type.
+
+    The buffer is allocated only when there is no buffer with the same
+    shape and data type for the key yet.
+
+    Parameters
+    ----------
+    buffers : dict
+        the buffers that have been allocated, keyed by their usage
+    key : str
+        the usage of the buffer
+    shape : tuple
+        the shape of the buffer
+    dtype : type
+        the data type of the buffer
+
+    Returns
+    -------
+    buffer : ndarray
+        the uninitialised buffer
+
+    """
+    buffer = buffers.get(key)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = buffers[key] = np.empty(shape, dtype=dtype)
+
+    return buffer
+
+
+def _probe_ptycho_file(
+    fp, include_scan, include_proj, raw_dir, *, check_file=True
+):
+    """Identify a ptychography reconstruction file.
+
+    This runs in the worker processes of a pool. The file is opened
+    once, and the attributes of the projection file are filled from it
+    if the file should be included.
+
+    Parameters
+    ----------
+    fp : pathlib.Path or str
+        the candidate file path
+    include_scan : frozenset
+        the identifiers of scans to include
+    include_proj : frozenset
+        the identifiers of projections to include
+    raw_dir : pathlib.Path or None
+        the directory where the raw data are stored
+    check_file : bool, optional
+        whether to determine the software by checking the essential
+        paths in the file. If it is False, the software is determined
+        from the file extension only. Default to True.
+
+    Returns
+    -------
+    pty_file : PtyPyFile, PtyREXFile or None
+        the projection file, or None if it is not a supported
+        reconstruction file or it should not be included
+
+    """
+    # open once without file locking, a file that is not HDF5 fails here
+    try:
+        h5file = h5py.File(fp, "r", locking=False)
+    except OSError:
+        return None
+
+    with h5file:
+        if check_file:
+            # look at the keys of the file to determine its type
+            is_ptypy = all(p in h5file for p in PtyPyFile.essential_paths)
+            is_ptyrex = not is_ptypy and all(
+                p in h5file for p in PtyREXFile.essential_paths
+            )
+        else:
+            # trust the file extension
+            suffix = Path(fp).suffix
+            is_ptypy = suffix in PtyPyFile.extensions
+            is_ptyrex = suffix in PtyREXFile.extensions
+
+        if not is_ptypy and not is_ptyrex:
+            return None
+
+        try:
+            if is_ptypy:
+                # for PtyPy file, projection number doesn't matter
+                pty_file = PtyPyFile.from_open(
+                    h5file, id_proj=0, verify=False, raw_dir=raw_dir
+                )
+                to_include = pty_file.id_scan in include_scan
+            else:
+                pty_file = PtyREXFile.from_open(
+                    h5file, verify=False, raw_dir=raw_dir
+                )
+                to_include = (
+                    pty_file.id_scan in include_scan
+                    and pty_file.id_proj in include_proj
+                )
+
+            if not to_include:
+                return None
+
+            with pty_file.reading(h5file):
+                pty_file.fill_attr()
+        except KeyError as err:
+            # only expected if the file is trusted by its extension
+            software = PtyPyFile if is_ptypy else PtyREXFile
+            msg = (
+                f"The file {fp} is not a reconstruction from "
+                f"{software.software} as its extension suggests. Is "
+                "the projection file check skipped?"
+            )
+            raise KeyError(msg) from err
+
+    return pty_file
+
+
 class PtychoTomo(TomoExpt):
     """Represent a ptycho-tomography experiment."""
 
     name = "ptychography"
     short_name = "ptycho"
+    # each thread keeps its own scratch arrays of the size of a
+    # projection, up to about six of them (complex, modulus, phase, the
+    # padded ones and the median), so the peak memory grows with the
+    # number of threads. The encoding and the writing hold the GIL, so
+    # more threads add little.
+    stack_nthread = 8
     supported_software = MappingProxyType(
         {
             "PtyPy": PtyPyFile,
@@ -37,7 +165,11 @@ class PtychoTomo(TomoExpt):
     remove_ramp = FixedValue()
     median_norm = FixedValue()
     unwrap_phase = FixedValue()
+    quantise_phase = FixedValue()
+    half_modulus = FixedValue()
+    skip_proj_file_check = FixedValue()
     rescale = FixedValue()
+    virtual = FixedValue()
 
     def __init__(
         self,
@@ -97,8 +229,10 @@ class PtychoTomo(TomoExpt):
             whether to pad the individual projection if it is not at the
             maximum size of the stack. Default to True. If it is False
             and there is inconsistent size, RuntimeError is raised.
-        compress : bool, optional
-            whether to apply compression (Blosc) to the NXtomo file.
+        compress : bool or str, optional
+            whether to apply compression (Blosc2) to the NXtomo file. It
+            can be the name of the codec, "zstd" for better compression
+            ratio or "lz4" for higher throughput, and True means "zstd".
             Default to False.
         kwargs : dict, optional
             options for ptycho-tomography
@@ -124,7 +258,11 @@ class PtychoTomo(TomoExpt):
         self._remove_ramp = kwargs.get("remove_ramp", False)
         self._median_norm = kwargs.get("median_norm", False)
         self._unwrap_phase = kwargs.get("unwrap_phase", False)
+        self._quantise_phase = kwargs.get("quantise_phase", False)
+        self._half_modulus = kwargs.get("half_modulus", False)
+        self._skip_proj_file_check = kwargs.get("skip_proj_file_check", False)
         self._rescale = kwargs.get("rescale", False)
+        self._virtual = kwargs.get("virtual", False)
 
     def find_all_projections(self):
         """Find all projections.
@@ -133,42 +271,20 @@ class PtychoTomo(TomoExpt):
         file to self.projections if they should be included as informed
         by self.include_scan and self.include_proj.
         """
-        pty_files = deque()
-
         if self.proj_from_placeholder:
             file_iter = self.proj_from_placeholder
         else:
-            extensions = self._supported_extensions()
-            file_iter = self.proj_dir.glob(f"**/*[{','.join(extensions)}]")
-
-        for fp in file_iter:
-            # look at the keys of the file to determine its type
-            if h5py.is_hdf5(fp):
-                if file_has_paths(fp, PtyPyFile.essential_paths):
-                    # for PtyPy file, projection number doesn't matter
-                    pty_file = PtyPyFile(
-                        fp, id_proj=0, verify=False, raw_dir=self.raw_dir
-                    )
-
-                    to_include = pty_file.id_scan in self.include_scan
-
-                    if to_include:
-                        pty_file.fill_attr()
-                        pty_files.append(pty_file)
-
-                elif file_has_paths(fp, PtyREXFile.essential_paths):
-                    pty_file = PtyREXFile(
-                        fp, verify=False, raw_dir=self.raw_dir
-                    )
-
-                    to_include = (
-                        pty_file.id_scan in self.include_scan
-                        and pty_file.id_proj in self.include_proj
-                    )
-
-                    if to_include:
-                        pty_file.fill_attr()
-                        pty_files.append(pty_file)
+            file_iter = self._iter_proj_files()
+
+        # the identifiers are only tested for membership when probing
+        probe = partial(
+            _probe_ptycho_file,
+            include_scan=frozenset(self.include_scan),
+            include_proj=frozenset(self.include_proj),
+            raw_dir=self.raw_dir,
+            check_file=not self._skip_proj_file_check,
+        )
+        pty_files = self._probe_files(probe, file_iter)
 
         self._projections = self._preliminary_sort(pty_files)
 
@@ -177,25 +293,37 @@ class PtychoTomo(TomoExpt):
             raise RuntimeError(msg)
 
     def _preliminary_sort(self, files):
-        software = {file.software for file in files}
+        # stop at the first file from a different software, the files
+        # almost always come from a single software
+        software = {files[0].software} if files else set()
+        for file in files:
+            if file.software not in software:
+                software.add(file.software)
+                break
         self._check_software_num(software)
 
         self._software = next(iter(software))
 
         if self._software == PtyPyFile.software:
             # for PtyPy, sort by scan id
-            return sorted(files, key=lambda x: int(x.id_scan))
-        if self._software == PtyREXFile.software:
+            ids = (file.id_scan for file in files)
+        elif self._software == PtyREXFile.software:
             # for PtyREX, sort by proj id
-            return sorted(files, key=lambda x: int(x.id_proj))
+            ids = (file.id_proj for file in files)
+        else:
+            sw = quote_iterable(list(self.supported_software.keys()))
+            msg = (
+                "The software that produces the ptychography "
+                f"reconstruction files ({self._software}) is not "
+                f"supported. Currently it supports {sw}."
+            )
+            raise TypeError(msg)
 
-        sw = quote_iterable(list(self.supported_software.keys()))
-        msg = (
-            "The software that produces the ptychography "
-            f"reconstruction files ({self._software}) is not "
-            f"supported. Currently it supports {sw}."
-        )
-        raise TypeError(msg)
+        # the ids are converted once and sorted as an array, like the
+        # sorting by angle
+        keys = np.fromiter(map(int, ids), dtype=np.int64, count=len(files))
+        order = np.argsort(keys, kind="stable")
+        return [files[i] for i in order.tolist()]
 
     def _check_software_num(self, software):
         if (num_sw := len(software)) == 0:
@@ -231,34 +359,6 @@ class PtychoTomo(TomoExpt):
 
         _ = self.check_missing_projections()
 
-    def _arrange_by_angle(self):
-        # update id_angle for the projections
-        for pty_file, rot_ang in zip(
-            self._projections,
-            self.metadata.rotation_angle,
-            strict=False,
-        ):
-            pty_file._id_angle = rot_ang
-
-        if self.sort_by_angle:
-            self._projections = sorted(
-                self._projections,
-                key=lambda x: float(x.id_angle),
-            )
-        # filter angle
-        if self._include_angle:
-            self._projections = self._filter_angle()
-
-    def _filter_angle(self):
-        filtered = deque()
-        for pty_file in self._projections:
-            if np.any(
-                np.abs(pty_file.id_angle - self._include_angle)
-                < self.angle_tol,
-            ):
-                filtered.append(pty_file)
-        return list(filtered)
-
     def stack_projection(self, mode=0, *, reverse=False):
         """Save the stack of projections into NXtomo files.
 
@@ -280,72 +380,66 @@ class PtychoTomo(TomoExpt):
         cplx_cm = (
             nullcontext()
             if nxtomo_cplx is None
-            else h5py.File(nxtomo_cplx, "r+")
+            else self.open_nxtomo(nxtomo_cplx)
         )
         modl_cm = (
             nullcontext()
             if nxtomo_modl is None
-            else h5py.File(nxtomo_modl, "r+")
+            else self.open_nxtomo(nxtomo_modl)
         )
         phas_cm = (
             nullcontext()
             if nxtomo_phas is None
-            else h5py.File(nxtomo_phas, "r+")
+            else self.open_nxtomo(nxtomo_phas)
         )
 
-        with cplx_cm as f_cplx, modl_cm as f_modl, phas_cm as f_phas:
-            for k, pty_file in enumerate(self._projections):
-                rot_ang = pty_file.id_angle
-
-                if pty_file.avail_complex:
-                    # if complex data is present, use it to get
-                    # modulus/phase to reduce latency from I/O
-                    ob_cplx = pty_file.object_complex(mode=mode)
-
-                    if f_cplx:
-                        complex_ = self._resize_proj(ob_cplx, self.stack_shape)
-
-                        self._save_proj_to_dset(f_cplx, k, complex_, rot_ang)
-
-                    if f_modl:
-                        ob_modl = np.abs(ob_cplx)
-                        modulus = self._resize_proj(ob_modl, self.stack_shape)
-
-                        self._save_proj_to_dset(f_modl, k, modulus, rot_ang)
-
-                    if f_phas:
-                        if self._remove_ramp:
-                            ob_cplx = remove_phase_ramp(ob_cplx)
-                        if self._median_norm:
-                            ob_cplx = phase_shift(
-                                ob_cplx,
-                                -np.median(np.angle(ob_cplx)),
-                            )
-
-                        ob_phas = np.angle(ob_cplx)
-                        phase = self._resize_proj(ob_phas, self.stack_shape)
-                        if self._unwrap_phase:
-                            phase = unwrap_phase(phase)
-
-                        self._save_proj_to_dset(f_phas, k, phase, rot_ang)
-                else:
-                    # complex not availabe, only save modulus/phase
-                    if f_modl:
-                        ob_modl = pty_file.object_modulus(mode=mode)
-                        modulus = self._resize_proj(ob_modl, self.stack_shape)
-
-                        self._save_proj_to_dset(f_modl, k, modulus, rot_ang)
-
-                    if f_phas:
-                        if self._remove_ramp or self._median_norm:
-                            # log warning here
-                            pass
-                        ob_phas = pty_file.object_phase(mode=mode)
-                        phase = self._resize_proj(ob_phas, self.stack_shape)
-                        if self._unwrap_phase:
-                            phase = unwrap_phase(phase)
+        with (
+            cplx_cm as f_cplx,
+            modl_cm as f_modl,
+            phas_cm as f_phas,
+            ExitStack() as writer_stack,
+        ):
+            # map the stored projections instead of copying them if
+            # possible, then they are skipped when stacking below
+            to_copy = [
+                fh if fh and not self._map_virtual(fh, kind, mode) else None
+                for fh, kind in zip(
+                    (f_cplx, f_modl, f_phas),
+                    ("complex", "modulus", "phase"),
+                    strict=True,
+                )
+            ]
+
+            # bind the writers of the outputs once for all projections,
+            # they flush what they buffer when the stack is complete
+            writer_cms = (
+                self._proj_writer(to_copy[0]) if to_copy[0] else None,
+                self._proj_writer(to_copy[1]) if to_copy[1] else None,
+                self._phase_writer(to_copy[2]) if to_copy[2] else None,
+            )
+            writers = tuple(
+                cm and writer_stack.enter_context(cm) for cm in writer_cms
+            )
 
-                        self._save_proj_to_dset(f_phas, k, phase, rot_ang)
+            # each thread reads, processes and writes whole projections,
+            # the HDF5 calls are serialised by h5py but the computation
+            # in between can overlap
+            stack_one = partial(
+                self._stack_one,
+                mode=mode,
+                writers=writers,
+                thread_data=local(),
+            )
+            # up to self.stack_nthread threads, but no more than the
+            # CPUs or the projections, see stack_nthread for the memory
+            nthread = min(
+                self.stack_nthread,
+                available_cpus(),
+                max(self.num_projections, 1),
+            )
+            with ThreadPoolExecutor(max_workers=nthread) as executor:
+                # consume the results to raise any exception in threads
+                list(executor.map(stack_one, count(), self._projections))
 
         nxtomo_files = []
         if nxtomo_cplx is not None:
@@ -356,6 +450,200 @@ class PtychoTomo(TomoExpt):
             nxtomo_files.append(nxtomo_phas)
         self._nxtomo_output_files = nxtomo_files
 
+    def _stack_one(self, k, pty_file, mode, writers, thread_data):
+        save_cplx, save_modl, save_phas = writers
+
+        # scratch arrays reused by every projection of the same shape in
+        # this thread
+        if not hasattr(thread_data, "buffers"):
+            thread_data.buffers = {}
+        buffers = thread_data.buffers
+
+        if pty_file.avail_complex:
+            # if complex data is present, use it to get
+            # modulus/phase to reduce latency from I/O
+            ob_cplx = pty_file.object_complex(
+                mode=mode,
+                out=_reuse_buffer(
+                    buffers,
+                    "complex",
+                    pty_file.object_shape[-2:],
+                    pty_file.object_complex_dtype,
+                ),
+            )
+
+            if save_cplx:
+                complex_ = self._resize_proj(
+                    ob_cplx,
+                    self.stack_shape,
+                    out=_reuse_buffer(
+                        buffers,
+                        "complex_padded",
+                        self.stack_shape[1:],
+                        ob_cplx.dtype,
+                    ),
+                )
+
+                save_cplx(k, complex_)
+
+            if save_modl:
+                ob_modl = np.abs(
+                    ob_cplx,
+                    out=_reuse_buffer(
+                        buffers, "modulus", ob_cplx.shape, ob_cplx.real.dtype
+                    ),
+                )
+                modulus = self._resize_proj(
+                    ob_modl,
+                    self.stack_shape,
+                    out=_reuse_buffer(
+                        buffers,
+                        "modulus_padded",
+                        self.stack_shape[1:],
+                        ob_modl.dtype,
+                    ),
+                )
+
+                save_modl(k, modulus)
+
+            if save_phas:
+                if self._remove_ramp:
+                    ob_cplx = remove_phase_ramp(ob_cplx)
+
+                # the same as np.angle but without allocation
+                ob_phas = np.arctan2(
+                    ob_cplx.imag,
+                    ob_cplx.real,
+                    out=_reuse_buffer(
+                        buffers, "phase", ob_cplx.shape, ob_cplx.real.dtype
+                    ),
+                )
+                if self._median_norm:
+                    # the median partitions a copy of the phase, keep
+                    # the copy in a scratch array instead of a new
+                    # allocation for every projection
+                    median = phase_median(
+                        ob_phas,
+                        scratch=_reuse_buffer(
+                            buffers, "median", ob_phas.shape, ob_phas.dtype
+                        ),
+                    )
+                    # the shifted phase is wrapped again even if it is
+                    # unwrapped next, as the unwrapped result of a plain
+                    # subtraction can be off by 2 pi from the phase of
+                    # the shifted complex array
+                    ob_phas = shift_wrapped_phase(ob_phas, median)
+
+                phase = self._resize_proj(
+                    ob_phas,
+                    self.stack_shape,
+                    out=_reuse_buffer(
+                        buffers,
+                        "phase_padded",
+                        self.stack_shape[1:],
+                        ob_phas.dtype,
+                    ),
+                )
+                if self._unwrap_phase:
+                    phase = unwrap_phase(phase, out=phase)
+
+                save_phas(k, phase)
+        else:
+            # complex not availabe, only save modulus/phase
+            if save_modl:
+                ob_modl = pty_file.object_modulus(mode=mode)
+                modulus = self._resize_proj(
+                    ob_modl,
+                    self.stack_shape,
+                    out=_reuse_buffer(
+                        buffers,
+                        "modulus_padded",
+                        self.stack_shape[1:],
+                        ob_modl.dtype,
+                    ),
+                )
+
+                save_modl(k, modulus)
+
+            if save_phas:
+                if self._remove_ramp or self._median_norm:
+                    # log warning here
+                    pass
+                ob_phas = pty_file.object_phase(mode=mode)
+                phase = self._resize_proj(
+                    ob_phas,
+                    self.stack_shape,
+                    out=_reuse_buffer(
+                        buffers,
+                        "phase_padded",
+                        self.stack_shape[1:],
+                        ob_phas.dtype,
+                    ),
+                )
+                if self._unwrap_phase:
+                    phase = unwrap_phase(phase, out=phase)
+
+                save_phas(k, phase)
+
+    @contextmanager
+    def _phase_writer(self, fh):
+        with self._proj_writer(fh) as save_proj_to_dset:
+            if not self._quantise_phase:
+                yield save_proj_to_dset
+                return
+
+            # the scale factors are buffered and flushed in one write
+            scale_dset = fh[self.scale_dset_path]
+            scales = np.ones(scale_dset.shape, dtype=scale_dset.dtype)
+
+            # the phase is scaled in a scratch array of each thread
+            thread_data = local()
+
+            def save_quantised_phase_to_dset(proj_index, phase):
+                if not hasattr(thread_data, "buffers"):
+                    thread_data.buffers = {}
+                scratch = _reuse_buffer(
+                    thread_data.buffers, "scaled", phase.shape, phase.dtype
+                )
+                phase, scales[proj_index] = quantise_phase(
+                    phase, scratch=scratch
+                )
+
+                save_proj_to_dset(proj_index, phase)
+
+            yield save_quantised_phase_to_dset
+
+            scale_dset[:] = scales
+
+    def _map_virtual(self, fh, kind, mode):
+        # the projections can only be mapped if they are stored as they
+        # are, without any compression, processing or padding
+        if not self._virtual or self.compress:
+            return False
+
+        if kind == "modulus" and self._half_modulus:
+            return False
+
+        if kind == "phase" and (
+            self._remove_ramp
+            or self._median_norm
+            or self._unwrap_phase
+            or self._quantise_phase
+        ):
+            return False
+
+        sources = []
+        for pty_file in self._projections:
+            source = pty_file.object_virtual_source(kind, mode=mode)
+            if source is None or source.shape != self.stack_shape[1:]:
+                return False
+            sources.append(source)
+
+        angles = [pty_file.id_angle for pty_file in self._projections]
+        self._save_virtual_proj_to_dset(fh, sources, angles)
+
+        return True
+
     def _nxtomo_minimal(self):
         self._stack_shape = self._decide_stack_shape()
 
@@ -418,6 +706,9 @@ class PtychoTomo(TomoExpt):
                 label="object modulus dtype",
             )
 
+            if self._half_modulus:
+                modl_dtype = np.float16
+
             nxtomo_modl = self.create_minimal_nxtomo(
                 f_modl,
                 self._stack_shape,
@@ -440,10 +731,14 @@ class PtychoTomo(TomoExpt):
                 label="object phase dtype",
             )
 
+            if self._quantise_phase:
+                phas_dtype = np.int16
+
             nxtomo_phas = self.create_minimal_nxtomo(
                 f_phas,
                 self._stack_shape,
                 phas_dtype,
+                scale_factor=self._quantise_phase,
             )
         else:
             nxtomo_phas = None
@@ -453,9 +748,7 @@ class PtychoTomo(TomoExpt):
     def _log_enter_stack_projection(self, level, name):
         st = super()._log_enter_stack_projection(level, name)
 
-        if self.logger is None:
-            self._logger = create_logger(level=level, name=name)
-        logger = self.logger
+        logger = self._ensure_logger(level, name)
 
         complex_msg = (
             "The complex reconstruction will "
@@ -467,10 +760,14 @@ class PtychoTomo(TomoExpt):
             + "not " * (not self.save_modulus)
             + "be saved."
         )
+        half_modulus_msg = (
+            "The modulus will "
+            + "not " * (not self.half_modulus)
+            + "be stored in half precision."
+        )
         phase_msg = (
             "The phase will " + "not " * (not self.save_phase) + "be saved."
         )
-        phase_ramp_msg = "Phase ramp removal is not yet implemented."
         median_norm_msg = (
             "The phase will "
             + "not " * (not self.median_norm)
@@ -481,15 +778,33 @@ class PtychoTomo(TomoExpt):
             + "not " * (not self.unwrap_phase)
             + "be unwrapped."
         )
-        rescale_msg = "Rescale is not yet implemented."
+        quantise_phase_msg = (
+            "The phase will "
+            + "not " * (not self.quantise_phase)
+            + "be quantised as 16-bit integers."
+        )
+        virtual_msg = (
+            "The projections will be mapped as virtual datasets if they "
+            "are stored as they are."
+        )
         logger.info(complex_msg)
         logger.info(modulus_msg)
+        if self.save_modulus:
+            logger.info(half_modulus_msg)
         logger.info(phase_msg)
         if self.save_phase:
-            if self.remove_ramp:
-                logger.warning(phase_ramp_msg)
             logger.info(median_norm_msg)
             logger.info(unwrap_phase_msg)
-        if self.rescale:
-            logger.warning(rescale_msg)
+            logger.info(quantise_phase_msg)
+        if self.virtual:
+            logger.info(virtual_msg)
+        self._log_warn_stack_projection(level, name)
         return st
+
+    def _log_warn_stack_projection(self, level, name):
+        logger = self._ensure_logger(level, name)
+
+        if self.save_phase and self.remove_ramp:
+            logger.warning("Phase ramp removal is not yet implemented.")
+        if self.rescale:
+            logger.warning("Rescale is not yet implemented.")
@@ -5,19 +5,32 @@ This module provides:
             collection.
 """
 
-import re
+import logging
+import os
 import time
 from contextlib import contextmanager, suppress
-from functools import cached_property
-from itertools import chain
+from functools import cached_property, lru_cache
+from itertools import chain, islice, takewhile
+from multiprocessing import Pool
 from pathlib import Path
 from types import MappingProxyType
 
+import h5py
 import numpy as np
 
-from nxstacker.io.nxtomo.minimal import LINK_DATA, LINK_ROT_ANG, create_minimal
+from nxstacker.io.nxtomo.minimal import (
+    LIBVER,
+    LINK_DATA,
+    LINK_ROT_ANG,
+    LINK_SCALE,
+    create_minimal,
+    encode_chunk,
+    map_virtual_data,
+)
+from nxstacker.utils.io import available_cpus
 from nxstacker.utils.logger import create_logger
 from nxstacker.utils.model import (
+    CompressionCodec,
     Directory,
     ExperimentFacility,
     FilePath,
@@ -26,6 +39,82 @@ from nxstacker.utils.model import (
 )
 from nxstacker.utils.parse import quote_iterable
 
+# above this number of angle pairs, compare with the nearest angles only
+MAX_ANGLE_PAIRS = 1_000_000
+
+# the dataset paths in hdf5 for projections, rotation angle and scale
+# factor, the same for every experiment
+_PROJ_DSET_PATH = str(LINK_DATA)
+_ROT_ANG_DSET_PATH = str(LINK_ROT_ANG)
+_SCALE_DSET_PATH = str(LINK_SCALE)
+
+
+def _distance_to_nearest(values, targets):
+    """Find the distance from each value to its nearest target.
+
+    Only the targets on either side of a value are compared, so it
+    scales with the number of values rather than the number of pairs.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        the values to compare
+    targets : numpy.ndarray
+        the targets to compare with, it should not be empty
+
+    Returns
+    -------
+    distance : numpy.ndarray
+        the absolute distance from each value to the nearest target
+
+    """
+    targets = np.sort(targets)
+    right = np.searchsorted(targets, values).clip(0, targets.size - 1)
+    left = (right - 1).clip(0)
+    return np.minimum(
+        np.abs(values - targets[left]),
+        np.abs(values - targets[right]),
+    )
+
+
+@lru_cache
+def _pad_width(proj_shape, stack_shape):
+    """Find the padding of a projection to the stack shape.
+
+    The padding only depends on the shapes, so it is worked out once
+    for every shape of projection in the stack.
+
+    Parameters
+    ----------
+    proj_shape : tuple
+        the shape of the projection
+    stack_shape : tuple
+        the shape of a projection in the stack
+
+    Returns
+    -------
+    pad_width : tuple or None
+        the number of values padded to the edges of each axis, or None
+        if the projection is not smaller than the stack in any axis
+
+    """
+    proj_y, proj_x = proj_shape
+    stack_y, stack_x = stack_shape
+
+    if proj_y >= stack_y and proj_x >= stack_x:
+        return None
+
+    # pad to stack shape if the projection is smaller than others
+    y_diff = stack_y - proj_y
+    top = y_diff // 2
+    bottom = top + y_diff % 2
+
+    x_diff = stack_x - proj_x
+    left = x_diff // 2
+    right = left + x_diff % 2
+
+    return (top, bottom), (left, right)
+
 
 class TomoExpt:
     """Hold attributes/methods common for tomography data collection."""
@@ -33,6 +122,12 @@ class TomoExpt:
     name = "tomography"
     short_name = "tomo"
     angle_tol = 1e-3
+    # the maximum number of processes probing the projection files, it
+    # is capped by the number of usable CPUs
+    probe_nproc = 16
+    proj_dset_path = _PROJ_DSET_PATH
+    rot_ang_dset_path = _ROT_ANG_DSET_PATH
+    scale_dset_path = _SCALE_DSET_PATH
     supported_software = MappingProxyType({})
     proj_dir = Directory(must_exist=True)
     proj_file = FilePath(undefined_ok=True)
@@ -47,7 +142,7 @@ class TomoExpt:
     stack_shape = FixedValue()
     sort_by_angle = FixedValue()
     pad_to_max = FixedValue()
-    compress = FixedValue()
+    compress = CompressionCodec()
     metadata = FixedValue()
     nxtomo_output_files = FixedValue()
     logger = FixedValue()
@@ -73,6 +168,7 @@ class TomoExpt:
         self.raw_dir = raw_dir
 
         self.facility = facility
+        self.facility_id = self.facility.name
 
         self.include_scan = include_scan
         self.include_proj = include_proj
@@ -102,7 +198,9 @@ class TomoExpt:
         """To be implemented in the subclass."""
         raise NotImplementedError
 
-    def create_minimal_nxtomo(self, filename, stack_shape, stack_dtype):
+    def create_minimal_nxtomo(
+        self, filename, stack_shape, stack_dtype, *, scale_factor=False
+    ):
         """Create a minimal NXtomo file."""
         md_dict = self.metadata.to_dict()
 
@@ -116,10 +214,28 @@ class TomoExpt:
             stack_dtype,
             self.facility,
             compress=self.compress,
+            scale_factor=scale_factor,
             **md_dict,
         )
         return filename
 
+    def open_nxtomo(self, filename):
+        """Open an NXtomo file for writing the projections.
+
+        Parameters
+        ----------
+        filename : pathlib.Path or str
+            the NXtomo file created by create_minimal_nxtomo
+
+        Returns
+        -------
+        h5py.File
+            the file opened in "r+" mode with the same file format as it
+            is created
+
+        """
+        return h5py.File(filename, "r+", libver=LIBVER)
+
     def _nxtomo_file_prefix(self):
         common = f"tomo_{self.short_name}"
 
@@ -142,42 +258,89 @@ class TomoExpt:
             )
         return prefix
 
-    def _supported_extensions(self):
-        return list(
-            chain.from_iterable(
-                [
-                    file_type.extensions
-                    for file_type in self.supported_software.values()
-                ],
-            ),
-        )
+    def _iter_proj_files(self):
+        """Walk self.proj_dir for files with the supported extensions.
+
+        Symbolic links to directories are not followed.
+
+        Yields
+        ------
+        str
+            the path of the file
+
+        """
+        extensions = self.supported_extensions
+
+        # explicit stack instead of recursion for deep trees
+        dirs = [self.proj_dir]
+        while dirs:
+            with os.scandir(dirs.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif entry.name.endswith(extensions) and entry.is_file():
+                        yield entry.path
+
+    def _probe_files(self, probe, file_iter):
+        """Probe the candidate files in a pool of processes.
+
+        h5py serialises the calls to libhdf5 within a process, so the
+        file metadata are probed by processes rather than threads to
+        overlap the waits on the storage. The pool has up to
+        self.probe_nproc processes, but no more than the usable CPUs so
+        a small machine is not oversubscribed. The candidates are handed
+        to the pool as they come from 'file_iter', so walking the
+        directory overlaps with probing. If only one process would be
+        used, the files are probed in the current process instead.
+
+        Parameters
+        ----------
+        probe : callable
+            a module-level function, or a partial of it, which takes a
+            file path and returns a picklable projection file, or None
+            if it is not a projection file to be included
+        file_iter : iterable
+            the candidate file paths
+
+        Returns
+        -------
+        a list of the returned values of 'probe' which are not None, in
+        no particular order
+
+        """
+        # enough candidates to decide the size of the pool, the rest is
+        # consumed by the pool while the first ones are probed
+        file_iter = iter(file_iter)
+        max_nproc = min(self.probe_nproc, available_cpus())
+        first_files = list(islice(file_iter, max_nproc))
+
+        nproc = len(first_files)
+        candidates = chain(first_files, file_iter)
+        if nproc <= 1:
+            # no gain from a pool, skip the process start-up and the
+            # pickling of the results
+            return [r for r in map(probe, candidates) if r is not None]
+
+        with Pool(processes=nproc) as pool:
+            probed = pool.imap_unordered(probe, candidates)
+            return [r for r in probed if r is not None]
 
     def _substitute_placeholder_in_proj_dir(self):
-        if "%(scan)" in str(self.proj_file) or "%(proj)" in str(
-            self.proj_file
-        ):
-            if self.include_scan and self.include_proj:
-                scan_substituted = [
-                    str(self.proj_file).replace("%(scan)", scan)
-                    for scan in self.include_scan
-                ]
-                proj_files = []
-                for scan_sub in scan_substituted:
-                    proj_files.extend(
-                        [
-                            Path(scan_sub.replace("%(proj)", proj))
-                            for proj in self.include_proj
-                        ]
-                    )
-            elif self.include_scan and not self.include_proj:
-                proj_files = [
-                    Path((str(self.proj_file)).replace("%(scan)", scan))
-                    for scan in self.include_scan
-                ]
-            elif not self.include_scan and self.include_proj:
+        proj_file = str(self.proj_file)
+        if "%(scan)" in proj_file or "%(proj)" in proj_file:
+            if self.include_scan or self.include_proj:
+                # substitute both placeholders in a single pass, a
+                # placeholder without identifiers is kept as it is
+                template = (
+                    proj_file.replace("{", "{{")
+                    .replace("}", "}}")
+                    .replace("%(scan)", "{scan}")
+                    .replace("%(proj)", "{proj}")
+                )
                 proj_files = [
-                    Path((str(self.proj_file)).replace("%(proj)", proj))
-                    for proj in self.include_proj
+                    Path(template.format(scan=scan, proj=proj))
+                    for scan in self.include_scan or ("%(scan)",)
+                    for proj in self.include_proj or ("%(proj)",)
                 ]
             else:
                 proj_files = ()
@@ -189,54 +352,160 @@ class TomoExpt:
         return proj_files
 
     def _redefine_proj_dir_from_placeholder_in_path(self):
-        # redefine proj_dir if there is valid placeholder
-        placeholder = re.compile(r"%\((scan|proj)\)")
-        proj_dir = "/"
-        for pt in self.proj_file.parts:
-            if re.search(placeholder, pt) is None:
-                # no valid placeholder, part of proj_dir
-                proj_dir += f"{pt}/"
-            else:
-                # reach the first placeholder
-                break
-        self._proj_dir = Path(proj_dir).resolve()
+        # redefine proj_dir if there is valid placeholder, it consists
+        # of the parts before the first placeholder
+        proj_dir = takewhile(
+            lambda pt: "%(scan)" not in pt and "%(proj)" not in pt,
+            self.proj_file.parts,
+        )
+        self._proj_dir = Path(*proj_dir).resolve()
+
+    def _arrange_by_angle(self):
+        # update id_angle for the projections, as Python floats, there is
+        # one angle for each projection
+        rot_ang = np.asarray(self.metadata.rotation_angle, dtype=np.float64)
+        rot_ang = self._match_angles_to_projections(rot_ang)
+        for proj_file, angle in zip(
+            self._projections,
+            rot_ang.tolist(),
+            strict=True,
+        ):
+            proj_file._id_angle = angle
+
+        if self.sort_by_angle:
+            # sort with the angles at hand instead of reading them back
+            # from every projection file
+            order = np.argsort(rot_ang, kind="stable")
+            self._projections = [self._projections[i] for i in order.tolist()]
+            rot_ang = rot_ang[order]
+
+        # filter angle, the angles are kept as an array in the same order
+        # as the projections so they are not gathered again
+        if self._include_angle:
+            mask = self._filter_angle(rot_ang)
+            self._projections = [
+                proj_file
+                for proj_file, to_include in zip(
+                    self._projections, mask.tolist(), strict=True
+                )
+                if to_include
+            ]
+
+    def _match_angles_to_projections(self, rot_ang):
+        num_angles = rot_ang.size
+        num_projs = len(self._projections)
+        if num_angles < num_projs:
+            msg = (
+                f"There are {num_angles} rotation angles for "
+                f"{num_projs} projections. Every projection should have "
+                "a rotation angle."
+            )
+            raise ValueError(msg)
+
+        if num_angles > num_projs:
+            # the extra angles are not used by any projection
+            if (logger := self.logger) is not None:
+                logger.warning(
+                    f"There are {num_angles} rotation angles for "
+                    f"{num_projs} projections. Only the first "
+                    f"{num_projs} angles are used."
+                )
+            rot_ang = rot_ang[:num_projs]
+
+        return rot_ang
+
+    def _filter_angle(self, angles):
+        include = np.asarray(self._include_angle, dtype=np.float64)
+
+        if angles.size * include.size <= MAX_ANGLE_PAIRS:
+            # compare every pair of angles at once
+            diff = np.abs(angles[:, np.newaxis] - include[np.newaxis, :])
+            mask = (diff < self.angle_tol).any(axis=1)
+        else:
+            # only compare with the nearest included angles on both sides
+            mask = _distance_to_nearest(angles, include) < self.angle_tol
+
+        return mask
 
-    def _save_proj_to_dset(self, fh, proj_index, proj, angle):
+    @contextmanager
+    def _proj_writer(self, fh):
+        # look up the datasets and the settings once for all projections
+        # written to the file
         proj_dset = fh[self.proj_dset_path]
-        proj_dset[proj_index, :, :] = proj
+        rot_ang_dset = fh[self.rot_ang_dset_path]
+        chunks = proj_dset.chunks
+        dtype = proj_dset.dtype
+        compress = self.compress
+
+        def save_proj_to_dset(proj_index, proj):
+            if chunks == (1, *proj.shape):
+                # the projection fills exactly one chunk, write it
+                # directly to skip the filter pipeline and the chunk cache
+                chunk = encode_chunk(proj, dtype, compress=compress)
+                proj_dset.id.write_direct_chunk((proj_index, 0, 0), chunk)
+            else:
+                proj_dset[proj_index, :, :] = proj
+
+        yield save_proj_to_dset
+
+        # the angles are known before stacking, so they are written in
+        # one go rather than with every projection
+        rot_ang_dset[:] = [p.id_angle for p in self.projections]
+
+    def _save_virtual_proj_to_dset(self, fh, sources, angles):
+        map_virtual_data(fh, sources)
 
         rot_ang_dset = fh[self.rot_ang_dset_path]
-        rot_ang_dset[proj_index] = angle
+        rot_ang_dset[:] = angles
+
+    def _resize_proj(self, proj, stack_shape, out=None):
+        # most projections share the stack shape, return them untouched
+        # before working out any padding
+        stack_shape = tuple(stack_shape[1:])
+        if not self.pad_to_max or proj.shape == stack_shape:
+            return proj
 
-    def _resize_proj(self, proj, stack_shape):
+        if (pad_width := _pad_width(proj.shape, stack_shape)) is None:
+            return proj
+
+        (top, bottom), (left, right) = pad_width
         proj_y, proj_x = proj.shape
-        stack_y, stack_x = stack_shape[1:]
-
-        if self.pad_to_max and (proj_y < stack_y or proj_x < stack_x):
-            # pad to stack shape if the projection is smaller than
-            # others
-            y_diff = stack_y - proj_y
-            top = y_diff // 2
-            bottom = top + y_diff % 2
-
-            x_diff = stack_x - proj_x
-            left = x_diff // 2
-            right = left + x_diff % 2
-
-            final = np.pad(
-                proj,
-                ((top, bottom), (left, right)),
-                mode="symmetric",
-            )
-        else:
-            final = proj
+        if (
+            out is not None
+            and 0 <= top <= bottom <= proj_y
+            and 0 <= left <= right <= proj_x
+        ):
+            return self._pad_symmetric_into(proj, out, *pad_width)
+
+        return np.pad(proj, pad_width, mode="symmetric")
 
-        return final
+    @staticmethod
+    def _pad_symmetric_into(proj, out, y_pad, x_pad):
+        # the same as np.pad with mode="symmetric" when the padding is
+        # not wider than the projection, but it fills the given array
+        # instead of allocating a new one
+        top, bottom = y_pad
+        left, right = x_pad
+        proj_y, proj_x = proj.shape
+        y_end = top + proj_y
+        x_end = left + proj_x
+
+        out[top:y_end, left:x_end] = proj
+        out[:top, left:x_end] = proj[:top][::-1]
+        out[y_end:, left:x_end] = proj[proj_y - bottom :][::-1]
+
+        # the columns are reflected after the rows, like np.pad, so the
+        # corners come from the padded rows
+        out[:, :left] = out[:, left : 2 * left][:, ::-1]
+        out[:, x_end:] = out[:, x_end - right : x_end][:, ::-1]
+
+        return out
 
     def _gather_raw_dir_from_proj_file(self):
-        if self.num_projections != 0:
-            return list(dict.fromkeys(f.raw_dir for f in self.projections))
-        return [""]
+        # ordered and without duplicates, or an empty directory if there
+        # is no projection
+        raw_dirs = dict.fromkeys(f.raw_dir for f in self.projections)
+        return list(raw_dirs) or [""]
 
     def check_missing_projections(self):
         """Check any missing projections which should be included.
@@ -248,23 +517,18 @@ class TomoExpt:
             angle.
 
         """
-        missing_scan = []
-        missing_proj = []
-        missing_angle = []
-
-        if self.include_scan:
-            missing_scan = sorted(
-                set(self.include_scan) - {p.id_scan for p in self.projections}
-            )
-        if self.include_proj:
-            missing_proj = sorted(
-                set(self.include_proj) - {p.id_proj for p in self.projections}
-            )
-        if self.include_angle:
-            missing_angle = sorted(
-                set(self.include_angle)
-                - {p.id_angle for p in self.projections}
-            )
+        # gather the identifiers of the projections in one pass
+        found_scan = set()
+        found_proj = set()
+        found_angle = []
+        for p in self.projections:
+            found_scan.add(p.id_scan)
+            found_proj.add(p.id_proj)
+            found_angle.append(p.id_angle)
+
+        missing_scan = sorted(set(self.include_scan) - found_scan)
+        missing_proj = sorted(set(self.include_proj) - found_proj)
+        missing_angle = self._missing_angle(found_angle)
 
         if (logger := self.logger) is not None:
             if missing_scan:
@@ -287,17 +551,51 @@ class TomoExpt:
 
         return missing_scan, missing_proj, missing_angle
 
+    def _missing_angle(self, found_angle):
+        # the angles are floats, an included angle is missing if no
+        # projection is within the tolerance
+        include = sorted(set(self.include_angle), key=float)
+        if not include:
+            return []
+        if not found_angle or None in found_angle:
+            return include
+
+        nearest = _distance_to_nearest(
+            np.asarray(include, dtype=np.float64),
+            np.asarray(found_angle, dtype=np.float64),
+        )
+        return [
+            angle
+            for angle, dist in zip(include, nearest.tolist(), strict=True)
+            if not dist < self.angle_tol
+        ]
+
+    def _ensure_logger(self, level=None, name=None):
+        # the logger is created by the first log message, the later
+        # messages reuse it regardless of their level and name
+        if self.logger is None:
+            self._logger = create_logger(level=level, name=name)
+        return self.logger
+
+    def _logs_info(self, level=None, name=None):
+        # the logger is still created when it is quiet, as the warnings
+        # are shown anyway, but the timing and the info messages are
+        # skipped altogether, see _log_warn_stack_projection
+        return self._ensure_logger(level, name).isEnabledFor(logging.INFO)
+
     @contextmanager
     def log_find_all_projection(self, level=None, name=None, *, dry_run=False):
         """Log the method find_all_projections."""
+        if not self._logs_info(level, name):
+            yield
+            return
+
         st = self._log_enter_find_all_projections(level, name, dry_run)
         yield
         self._log_exit_find_all_projections(st, level, name)
 
     def _log_enter_find_all_projections(self, level, name, dry_run):
-        if self.logger is None:
-            self._logger = create_logger(level=level, name=name)
-        logger = self.logger
+        logger = self._ensure_logger(level, name)
 
         logger.info("")
         if dry_run:
@@ -317,9 +615,7 @@ class TomoExpt:
         return st
 
     def _log_exit_find_all_projections(self, st, level, name):
-        if self.logger is None:
-            self._logger = create_logger(level=level, name=name)
-        logger = self.logger
+        logger = self._ensure_logger(level, name)
 
         logger.info("Finished finding projections.")
         elapse = time.perf_counter() - st
@@ -339,14 +635,16 @@ class TomoExpt:
     @contextmanager
     def log_extract_projections_details(self, level=None, name=None):
         """Log the method extract_projections_details."""
+        if not self._logs_info(level, name):
+            yield
+            return
+
         st = self._log_enter_extract_projections_details(level, name)
         yield
         self._log_exit_extract_projections_details(st, level, name)
 
     def _log_enter_extract_projections_details(self, level, name):
-        if self.logger is None:
-            self._logger = create_logger(level=level, name=name)
-        logger = self.logger
+        logger = self._ensure_logger(level, name)
 
         logger.info("")
         logger.info("Start extracting projection metadata...")
@@ -354,9 +652,7 @@ class TomoExpt:
         return st
 
     def _log_exit_extract_projections_details(self, st, level, name):
-        if self.logger is None:
-            self._logger = create_logger(level=level, name=name)
-        logger = self.logger
+        logger = self._ensure_logger(level, name)
 
         logger.info("Finished extracting projection metadata.")
         elapse = time.perf_counter() - st
@@ -370,7 +666,8 @@ class TomoExpt:
             f"'{self.metadata.sample_description}'."
         )
         logger.info(
-            "The detector distance is {self.metadata.detector_distance:.3e} m."
+            "The detector distance is "
+            f"{self.metadata.detector_distance:.3e} m."
         )
         logger.info(f"The x pixel size is {self.metadata.x_pixel_size:.3e} m.")
         logger.info(f"The y pixel size is {self.metadata.y_pixel_size:.3e} m.")
@@ -388,14 +685,18 @@ class TomoExpt:
     @contextmanager
     def log_stack_projection(self, level=None, name=None):
         """Log the method stack_projection."""
+        if not self._logs_info(level, name):
+            # the warnings are shown even if it is quiet
+            self._log_warn_stack_projection(level, name)
+            yield
+            return
+
         st = self._log_enter_stack_projection(level, name)
         yield
         self._log_exit_stack_projection(st, level, name)
 
     def _log_enter_stack_projection(self, level, name):
-        if self.logger is None:
-            self._logger = create_logger(level=level, name=name)
-        logger = self.logger
+        logger = self._ensure_logger(level, name)
 
         logger.info("")
         logger.info("Start saving NXtomo file...")
@@ -403,11 +704,12 @@ class TomoExpt:
             f"The directory of the NXtomo file is '{self.nxtomo_dir}'."
         )
 
-        compress_msg = (
-            "The NXtomo file will "
-            + "not " * (not self.compress)
-            + "be compressed."
-        )
+        if self.compress:
+            compress_msg = (
+                f"The NXtomo file will be compressed with {self.compress}."
+            )
+        else:
+            compress_msg = "The NXtomo file will not be compressed."
         logger.info(compress_msg)
 
         pad_msg = (
@@ -420,10 +722,11 @@ class TomoExpt:
         st = time.perf_counter()
         return st
 
+    def _log_warn_stack_projection(self, level, name):
+        """To be implemented in the subclass if there is any warning."""
+
     def _log_exit_stack_projection(self, st, level, name):
-        if self.logger is None:
-            self._logger = create_logger(level=level, name=name)
-        logger = self.logger
+        logger = self._ensure_logger(level, name)
 
         logger.info("Finished saving NXtomo.")
         elapse = time.perf_counter() - st
@@ -438,9 +741,7 @@ class TomoExpt:
     def dry_run_msg(self, level=None, name=None):
         """Display the dry-run message at the end."""
         _ = self._log_enter_stack_projection(level=None, name=None)
-        if self.logger is None:
-            self._logger = create_logger(level=level, name=name)
-        logger = self.logger
+        logger = self._ensure_logger(level, name)
 
         logger.info("")
         logger.info("This is the end of the dry-run.")
@@ -451,16 +752,11 @@ class TomoExpt:
         return len(self.projections)
 
     @cached_property
-    def facility_id(self):
-        """Store the name of the facility."""
-        return self.facility.name
-
-    @cached_property
-    def proj_dset_path(self):
-        """Store the dataset path for projections in hdf5."""
-        return str(LINK_DATA)
-
-    @cached_property
-    def rot_ang_dset_path(self):
-        """Store the dataset path for rotation angle in hdf5."""
-        return str(LINK_ROT_ANG)
+    def supported_extensions(self):
+        """Store the file extensions of the supported software."""
+        return tuple(
+            chain.from_iterable(
+                file_type.extensions
+                for file_type in self.supported_software.values()
+            ),
+        )
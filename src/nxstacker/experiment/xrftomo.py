@@ -1,4 +1,7 @@
 from collections import deque
+from contextlib import ExitStack
+from functools import partial
+from multiprocessing import Pool
 from types import MappingProxyType
 
 import h5py
@@ -7,12 +10,150 @@ import numpy as np
 from nxstacker.experiment.tomoexpt import TomoExpt
 from nxstacker.io.nxtomo.metadata import MetadataXRF
 from nxstacker.io.xrf.python_processing import XRFWindowFile
-from nxstacker.utils.io import file_has_paths
-from nxstacker.utils.logger import create_logger
+from nxstacker.utils.io import available_cpus
 from nxstacker.utils.model import XRFTransitionList
 from nxstacker.utils.parse import quote_iterable, unique_or_raise
 
 
+def _probe_xrf_file(fp, include_scan, raw_dir):
+    """Identify a XRF window file.
+
+    This runs in the worker processes of a pool. The file is opened
+    once, and the attributes of the projection file are filled from it
+    if the file should be included.
+
+    Parameters
+    ----------
+    fp : pathlib.Path or str
+        the candidate file path
+    include_scan : frozenset
+        the identifiers of scans to include
+    raw_dir : pathlib.Path or None
+        the directory where the raw data are stored
+
+    Returns
+    -------
+    xrf_file : XRFWindowFile or None
+        the projection file, or None if it is not a XRF window file or
+        it should not be included
+
+    """
+    # open once without file locking, a file that is not HDF5 fails here
+    try:
+        h5file = h5py.File(fp, "r", locking=False)
+    except OSError:
+        return None
+
+    with h5file:
+        # look at the keys of the file to determine its type
+        if not all(p in h5file for p in XRFWindowFile.essential_paths):
+            return None
+
+        # projection number doesn't matter
+        xrf_file = XRFWindowFile.from_open(
+            h5file, id_proj=0, verify=False, raw_dir=raw_dir
+        )
+        if xrf_file.id_scan not in include_scan:
+            return None
+
+        with xrf_file.reading(h5file):
+            xrf_file.fill_attr()
+
+    return xrf_file
+
+
+def _read_elemental_map_attrs(xrf_file, transitions):
+    """Read the shapes and dtypes of the elemental maps of a file.
+
+    This runs in the worker processes of a pool. The file is opened
+    once for all the transitions.
+
+    Parameters
+    ----------
+    xrf_file : XRFWindowFile
+        the XRF window file
+    transitions : tuple
+        the transitions of the elemental maps
+
+    Returns
+    -------
+    map_attrs : list
+        the shape and dtype of the elemental map of each transition
+
+    """
+    with (
+        h5py.File(xrf_file.file_path, "r", locking=False) as h5file,
+        xrf_file.reading(h5file),
+    ):
+        return [xrf_file.elemental_map_attr(t) for t in transitions]
+
+
+def _read_elemental_maps(indexed_file, transitions):
+    """Read the elemental maps of a XRF window file.
+
+    This runs in the worker processes of a pool, so the maps of
+    different projections are read at the same time. The file is opened
+    once for all the transitions.
+
+    Parameters
+    ----------
+    indexed_file : tuple
+        the index of the projection in the stack and its XRFWindowFile
+    transitions : tuple
+        the transitions of the elemental maps
+
+    Returns
+    -------
+    index : int
+        the index of the projection in the stack
+    elemental_maps : list
+        the elemental map of each transition
+
+    """
+    index, xrf_file = indexed_file
+    with (
+        h5py.File(xrf_file.file_path, "r", locking=False) as h5file,
+        xrf_file.reading(h5file),
+    ):
+        elemental_maps = [xrf_file.elemental_map(t) for t in transitions]
+
+    return index, elemental_maps
+
+
+def _imap_bounded(pool, func, iterable, window):
+    """Apply a function to the items in a pool with bounded results.
+
+    Unlike Pool.imap, at most 'window' items are handed to the pool
+    before their results are taken, so the results waiting in the
+    current process do not grow with the number of items when they are
+    consumed slower than they are produced.
+
+    Parameters
+    ----------
+    pool : multiprocessing.pool.Pool
+        the pool of processes
+    func : callable
+        the function applied to each item
+    iterable : iterable
+        the items
+    window : int
+        the maximum number of items handed to the pool at a time
+
+    Yields
+    ------
+    the returned values of 'func', in the order of the items
+
+    """
+    pending = deque()
+    for item in iterable:
+        if len(pending) >= window:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(func, (item,)))
+
+    while pending:
+        yield pending.popleft().get()
+
+
 class XRFTomo(TomoExpt):
     """Represent a XRF-tomography experiment."""
 
@@ -23,6 +164,9 @@ class XRFTomo(TomoExpt):
             "window": XRFWindowFile,
         },
     )
+    # reading the elemental maps is shared by a pool of processes, each
+    # of them holds the maps of a few projections at a time
+    map_nproc = 8
     transition = XRFTransitionList()
 
     def __init__(
@@ -65,28 +209,18 @@ class XRFTomo(TomoExpt):
         file to self.projections if they should be included as informed
         by self.include_scan and self.include_proj.
         """
-        pty_files = deque()
-
         if self.proj_from_placeholder:
             file_iter = self.proj_from_placeholder
         else:
-            extensions = self._supported_extensions()
-            file_iter = self.proj_dir.glob(f"**/*[{','.join(extensions)}]")
-
-        for fp in file_iter:
-            # look at the keys of the file to determine its type
-            if h5py.is_hdf5(fp):  # noqa: SIM102
-                if file_has_paths(fp, XRFWindowFile.essential_paths):
-                    # projection number doesn't matter
-                    pty_file = XRFWindowFile(
-                        fp, id_proj=0, verify=False, raw_dir=self.raw_dir
-                    )
-
-                    to_include = pty_file.id_scan in self.include_scan
+            file_iter = self._iter_proj_files()
 
-                    if to_include:
-                        pty_file.fill_attr()
-                        pty_files.append(pty_file)
+        # the identifiers are only tested for membership when probing
+        probe = partial(
+            _probe_xrf_file,
+            include_scan=frozenset(self.include_scan),
+            raw_dir=self.raw_dir,
+        )
+        pty_files = self._probe_files(probe, file_iter)
 
         self._projections = self._preliminary_sort(pty_files)
 
@@ -95,7 +229,15 @@ class XRFTomo(TomoExpt):
             raise RuntimeError(msg)
 
     def _preliminary_sort(self, files):
-        return sorted(files, key=lambda x: int(x.id_scan))
+        # sort by scan id, converted once and sorted as an array like
+        # the ptychography files
+        keys = np.fromiter(
+            (int(file.id_scan) for file in files),
+            dtype=np.int64,
+            count=len(files),
+        )
+        order = np.argsort(keys, kind="stable")
+        return [files[i] for i in order.tolist()]
 
     def extract_projections_details(self):
         """Extract metadata from the projections.
@@ -114,34 +256,6 @@ class XRFTomo(TomoExpt):
 
         _ = self.check_missing_projections()
 
-    def _arrange_by_angle(self):
-        # update id_angle for the projections
-        for pty_file, rot_ang in zip(
-            self._projections,
-            self.metadata.rotation_angle,
-            strict=False,
-        ):
-            pty_file._id_angle = rot_ang
-
-        if self.sort_by_angle:
-            self._projections = sorted(
-                self._projections,
-                key=lambda x: float(x.id_angle),
-            )
-        # filter angle
-        if self._include_angle:
-            self._projections = self._filter_angle()
-
-    def _filter_angle(self):
-        filtered = deque()
-        for pty_file in self._projections:
-            if np.any(
-                np.abs(pty_file.id_angle - self._include_angle)
-                < self.angle_tol,
-            ):
-                filtered.append(pty_file)
-        return list(filtered)
-
     def stack_projection(self, *, reverse=False):
         """Save the stack of projections into NXtomo files.
 
@@ -155,26 +269,62 @@ class XRFTomo(TomoExpt):
         if reverse:
             self._projections = self._projections[::-1]
 
-        nxtomo_flist, stack_shapes = self._nxtomo_minimal()
+        read_attrs = partial(
+            _read_elemental_map_attrs, transitions=self.transition
+        )
+        read = partial(_read_elemental_maps, transitions=self.transition)
+        indexed_files = enumerate(self._projections)
+        nproc = min(self.map_nproc, available_cpus(), self.num_projections)
+
+        with ExitStack() as writer_stack:
+            if nproc > 1:
+                # h5py serialises the reads within a process, so the map
+                # attributes and then the maps themselves are read by a
+                # pool of processes. The pool is started before any
+                # NXtomo file is created. Only a couple of projections per
+                # process are read ahead of the writing, so the maps
+                # waiting to be written are bounded
+                pool = writer_stack.enter_context(Pool(processes=nproc))
+                map_attrs = pool.map(read_attrs, self._projections)
+                read_maps = _imap_bounded(
+                    pool, read, indexed_files, window=2 * nproc
+                )
+            else:
+                map_attrs = list(map(read_attrs, self._projections))
+                read_maps = map(read, indexed_files)
+
+            nxtomo_flist, stack_shapes = self._nxtomo_minimal(map_attrs)
+
+            # the NXtomo files of all transitions are written together,
+            # so each window file is only opened once
+            writers = []
+            for nxtomo_fp, st_sh in zip(
+                nxtomo_flist, stack_shapes, strict=True
+            ):
+                f = writer_stack.enter_context(self.open_nxtomo(nxtomo_fp))
+                save_proj = writer_stack.enter_context(self._proj_writer(f))
 
-        for nxtomo_fp, st_sh, transition in zip(
-            nxtomo_flist, stack_shapes, self.transition, strict=False
-        ):
-            with h5py.File(nxtomo_fp, "r+") as f:
-                for k, pty_file in enumerate(self._projections):
-                    rot_ang = pty_file.id_angle
-                    el_map = pty_file.elemental_map(transition)
+                # the padded maps are written before the next one is
+                # padded, so they share a buffer
+                stack_dtype = f[self.proj_dset_path].dtype
+                padded = np.empty(st_sh[1:], dtype=stack_dtype)
+                writers.append((save_proj, st_sh, padded))
 
-                    el_map = self._resize_proj(el_map, st_sh)
-                    self._save_proj_to_dset(f, k, el_map, rot_ang)
+            for k, el_maps in read_maps:
+                for el_map, (save_proj, st_sh, padded) in zip(
+                    el_maps, writers, strict=True
+                ):
+                    save_proj(k, self._resize_proj(el_map, st_sh, out=padded))
 
         self._nxtomo_output_files = nxtomo_flist
 
-    def _nxtomo_minimal(self):
+    def _nxtomo_minimal(self, map_attrs):
         nxtomo_flist = []
         stack_shapes = []
-        for t in self.transition:
-            stack_shape, stack_dtype = self._decide_stack_attr(t)
+        for k, t in enumerate(self.transition):
+            stack_shape, stack_dtype = self._decide_stack_attr(
+                [attrs[k] for attrs in map_attrs]
+            )
 
             prefix = self._nxtomo_file_prefix()
             f_trans = self._nxtomo_dir / f"{prefix}_{t}.nxs"
@@ -190,18 +340,12 @@ class XRFTomo(TomoExpt):
 
         return nxtomo_flist, stack_shapes
 
-    def _decide_stack_attr(self, transition):
-        map_attr = [
-            p.elemental_map_attr(transition) for p in self._projections
-        ]
-        map_shapes = [attr[0] for attr in map_attr]
-        map_dtype = [attr[1] for attr in map_attr]
+    def _decide_stack_attr(self, map_attr):
+        map_shapes, map_dtype = zip(*map_attr, strict=True)
 
         if self.pad_to_max:
             # determine maximum y and x sizes if pad to max
-            y_sh = [sh[0] for sh in map_shapes]
-            x_sh = [sh[1] for sh in map_shapes]
-            map_sh = (max(y_sh), max(x_sh))
+            map_sh = tuple(np.max(map_shapes, axis=0).tolist())
         else:
             map_sh = unique_or_raise(
                 map_shapes,
@@ -219,9 +363,7 @@ class XRFTomo(TomoExpt):
     def _log_enter_stack_projection(self, level, name):
         st = super()._log_enter_stack_projection(level, name)
 
-        if self.logger is None:
-            self._logger = create_logger(level=level, name=name)
-        logger = self.logger
+        logger = self._ensure_logger(level, name)
 
         lg = quote_iterable(self.transition)
         logger.info(
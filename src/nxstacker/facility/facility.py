@@ -1,10 +1,47 @@
 from collections.abc import Sequence
+from contextlib import contextmanager, nullcontext
+from functools import cache
 from pathlib import Path
+from types import MappingProxyType
 
+import h5py
 import yaml
 
+from nxstacker.utils.io import files_first_exist
+
 SPECS_DIR = Path(__file__).parent / "specs"
 
+# use the C loader from libyaml if PyYAML is built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@cache
+def _load_spec(path, mtime):  # noqa: ARG001
+    """Parse a facility specification file.
+
+    The result is cached by the path and the modification time, so a
+    file is only parsed again if it has been modified.
+
+    Parameters
+    ----------
+    path : str
+        the resolved path of the specification file
+    mtime : int
+        the modification time of the file in nanoseconds
+
+    Returns
+    -------
+    spec : types.MappingProxyType
+        the read-only specification, with the lists as tuples
+
+    """
+    with Path(path).open() as f:
+        spec = yaml.load(f, Loader=YAML_LOADER)  # noqa: S506
+
+    return MappingProxyType(
+        {k: tuple(v) if isinstance(v, list) else v for k, v in spec.items()}
+    )
+
 
 class AccumulatedDict(dict):
     """A dictionary which joins their values when merging."""
@@ -13,17 +50,12 @@ class AccumulatedDict(dict):
         if not isinstance(other, dict):
             return NotImplemented
 
-        new = dict(self)
-        for k, v in other.items():
-            original = self.get(k)
-
-            if original is None or isinstance(original, str):
-                new[k] = v
-            elif isinstance(original, list):
-                new[k].extend(list(v))
-            else:
-                original_list = [original]
-                new[k] = [*original_list, v]
+        # merge in place into a copy, the lists are copied as well so
+        # they are not extended in self
+        new = AccumulatedDict(
+            {k: list(v) if isinstance(v, list) else v for k, v in self.items()}
+        )
+        new |= other
 
         return new
 
@@ -66,7 +98,7 @@ class SpecsAccumulator:
 
         for spec in value:
             try:
-                f = spec.open()
+                mtime = spec.stat().st_mtime_ns
             except FileNotFoundError:
                 msg = (
                     f"The facility specification file '{spec.resolve()}' "
@@ -74,8 +106,13 @@ class SpecsAccumulator:
                 )
                 raise FileNotFoundError(msg) from None
             else:
-                obj.__dict__["_specs_dict"] |= yaml.safe_load(f)
-                f.close()
+                # the lists are extended when accumulating, so each
+                # instance gets its own copy of the parsed values
+                parsed = _load_spec(str(spec.resolve()), mtime)
+                obj.__dict__["_specs_dict"] |= {
+                    k: list(v) if isinstance(v, tuple) else v
+                    for k, v in parsed.items()
+                }
 
     def __delete__(self, obj):
         obj.__dict__[self.name] = []
@@ -87,12 +124,18 @@ class FacilityInfo:
 
     name = "unknown"
     specs = SpecsAccumulator()
+    max_open_files = 64
+    _open_files = None
+    _open_depth = 0
 
     def __init__(self):
         """Initialise the information common to different facility."""
         self._specs_dict = AccumulatedDict()
         self.specs = SPECS_DIR / "common.yaml"
 
+        # the files found from their candidate locations
+        self._found_files = {}
+
         self.source_type = "Synchrotron X-ray Source"
         self.source_name = "Diamond Light Source"
         self.source_name_short = "DLS"
@@ -117,6 +160,83 @@ class FacilityInfo:
                 val_list = list(current_val)
                 self.__dict__[attr_name] = val_list + list(attr_val)
 
+    def first_existing_file(self, candidates):
+        """Return the first existing file among the candidates.
+
+        The file found is remembered for the same candidates, so the
+        files of a scan are only looked for once, but it is checked
+        that it still exists before it is returned again. A miss is
+        not remembered, as the file may appear later.
+
+        Parameters
+        ----------
+        candidates : iterable
+            the candidate file paths, in the order of preference
+
+        Returns
+        -------
+        the first file path in 'candidates' that exists. 'None' is
+        returned if none of the files exists.
+
+        """
+        key = tuple(candidates)
+        found = self._found_files.get(key)
+        if found is not None and not Path(found).exists():
+            # removed since it was found, look for another candidate
+            del self._found_files[key]
+            found = None
+
+        if found is None:
+            found = files_first_exist(key)
+            if found is not None:
+                self._found_files[key] = found
+
+        return found
+
+    def clear_file_cache(self):
+        """Forget the files found by first_existing_file."""
+        self._found_files.clear()
+
+    @contextmanager
+    def keeping_files_open(self):
+        """Keep the HDF5 files read by the methods open within the context.
+
+        The metadata of many projections are often read from the same
+        files, e.g. the pty_tomo file of a scan in i13-1, so a file is
+        opened once within the context rather than once for every
+        item. At most self.max_open_files are kept open, the least
+        recently used one is closed first.
+
+        The context can be nested, the files are only closed when the
+        outermost one exits.
+        """
+        if self._open_depth == 0:
+            self._open_files = {}
+        self._open_depth += 1
+        try:
+            yield self
+        finally:
+            self._open_depth -= 1
+            if self._open_depth == 0:
+                for h5file in self._open_files.values():
+                    h5file.close()
+                del self._open_files
+
+    def _open(self, file_path):
+        """Open the HDF5 file for reading, or reuse the one kept open."""
+        if self._open_files is None:
+            return h5py.File(file_path, "r")
+
+        # the most recently used file is moved to the end
+        if (h5file := self._open_files.pop(file_path, None)) is None:
+            if len(self._open_files) >= self.max_open_files:
+                oldest = next(iter(self._open_files))
+                self._open_files.pop(oldest).close()
+            h5file = h5py.File(file_path, "r")
+        self._open_files[file_path] = h5file
+
+        return nullcontext(h5file)
+
     @property
     def specs_dict(self):
         """Return the accumulated specs dictionary."""
@@ -1,11 +1,8 @@
 from pathlib import Path
 
-import h5py
-
 from nxstacker.facility.facility import SPECS_DIR, FacilityInfo
 from nxstacker.utils.io import (
     dataset_from_first_valid_path,
-    files_first_exist,
 )
 from nxstacker.utils.parse import (
     add_timezone,
@@ -62,7 +59,7 @@ class I08_1(FacilityInfo):  # noqa: N801
             Path(f"{raw_dir}/i08-1-{scan_id}.nxs"),
         ]
 
-        nxs_f = files_first_exist(nxs_candidates)
+        nxs_f = self.first_existing_file(nxs_candidates)
 
         if nxs_f is not None:
             return nxs_f
@@ -91,7 +88,7 @@ class I08_1(FacilityInfo):  # noqa: N801
             the rotation angle, in degree
 
         """
-        with h5py.File(rot_f, "r") as f:
+        with self._open(rot_f) as f:
             dset = dataset_from_first_valid_path(f, self.rotation_angle_path)
             rot_ang = dset[()]
 
@@ -118,7 +115,7 @@ class I08_1(FacilityInfo):  # noqa: N801
             timestamp of the start time, in ISO 8601
 
         """
-        with h5py.File(start_time_f, "r") as f:
+        with self._open(start_time_f) as f:
             dset = dataset_from_first_valid_path(f, self.start_time_path)
             start_time = dset[()]
 
@@ -146,7 +143,7 @@ class I08_1(FacilityInfo):  # noqa: N801
             timestamp of the end time, in ISO 8601
 
         """
-        with h5py.File(end_time_f, "r") as f:
+        with self._open(end_time_f) as f:
             dset = dataset_from_first_valid_path(f, self.end_time_path)
             end_time = dset[()]
 
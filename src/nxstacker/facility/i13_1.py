@@ -1,12 +1,11 @@
 from datetime import datetime, timezone
 from pathlib import Path
 
-import h5py
+import numpy as np
 
 from nxstacker.facility.facility import SPECS_DIR, FacilityInfo
 from nxstacker.utils.io import (
     dataset_from_first_valid_path,
-    files_first_exist,
 )
 from nxstacker.utils.parse import (
     as_dls_staging_area,
@@ -37,6 +36,14 @@ class I13_1(FacilityInfo):  # noqa: N801
 
         self.populate_attr()
 
+        # the number of projections in the pty_tomo file of each scan
+        self._num_projs = {}
+
+        # reused for reading the rotation angles of each projection,
+        # keyed by the number of positions and the data type, as scans
+        # can differ in them
+        self._rot_bufs = {}
+
     def nxs_file(self, proj_file):
         """Return the path of NeXus file of a given projection file.
 
@@ -62,7 +69,7 @@ class I13_1(FacilityInfo):  # noqa: N801
             Path(f"{raw_dir}/{scan_id}.nxs"),
         ]
 
-        nxs_f = files_first_exist(nxs_candidates)
+        nxs_f = self.first_existing_file(nxs_candidates)
 
         if nxs_f is not None:
             return nxs_f
@@ -100,7 +107,7 @@ class I13_1(FacilityInfo):  # noqa: N801
             Path(f"{raw_dir}/{scan_id}/pty_tomo.h5"),
         ]
 
-        pty_tomo_f = files_first_exist(pty_tomo_candidates)
+        pty_tomo_f = self.first_existing_file(pty_tomo_candidates)
 
         if pty_tomo_f is not None:
             return pty_tomo_f
@@ -138,7 +145,7 @@ class I13_1(FacilityInfo):  # noqa: N801
             Path(f"{raw_dir}/{scan_id}/positions_0.h5"),
         ]
 
-        pos_f = files_first_exist(pos_candidates)
+        pos_f = self.first_existing_file(pos_candidates)
 
         if pos_f is not None:
             return pos_f
@@ -183,9 +190,16 @@ class I13_1(FacilityInfo):  # noqa: N801
             )
             raise IndexError(msg)
 
-        with h5py.File(rot_f, "r") as f:
+        with self._open(rot_f) as f:
             dset = dataset_from_first_valid_path(f, self.rotation_angle_path)
-            rot_ang = dset[int(proj_file.id_proj), :, 0].mean()
+            key = (dset.shape[1], dset.dtype)
+            if (buf := self._rot_bufs.get(key)) is None:
+                buf = self._rot_bufs[key] = np.empty(*key)
+
+            dset.read_direct(
+                buf, source_sel=np.s_[int(proj_file.id_proj), :, 0]
+            )
+            rot_ang = buf.mean()
 
         return rot_ang
 
@@ -203,7 +217,7 @@ class I13_1(FacilityInfo):  # noqa: N801
             the distance, in m
 
         """
-        with h5py.File(dist_f, "r") as f:
+        with self._open(dist_f) as f:
             dset = dataset_from_first_valid_path(
                 f, self.detector_distance_path
             )
@@ -216,8 +230,12 @@ class I13_1(FacilityInfo):  # noqa: N801
     def _tot_num_proj(self, proj_file):
         pty_tomo_f = self.pty_tomo_file(proj_file)
 
-        with h5py.File(pty_tomo_f, "r") as f:
-            num_projs = f["/data/frames"].shape[0]
+        # the same for all projections of a scan, and it is needed for
+        # every metadata item of each of them
+        if (num_projs := self._num_projs.get(pty_tomo_f)) is None:
+            with self._open(pty_tomo_f) as f:
+                num_projs = f["/data/frames"].shape[0]
+            self._num_projs[pty_tomo_f] = num_projs
 
         return num_projs
 
@@ -254,7 +272,7 @@ class I13_1(FacilityInfo):  # noqa: N801
             )
             raise IndexError(msg)
 
-        with h5py.File(start_time_f, "r") as f:
+        with self._open(start_time_f) as f:
             dset = dataset_from_first_valid_path(f, self.start_time_path)
 
             size = dset.shape[0]
@@ -307,7 +325,7 @@ class I13_1(FacilityInfo):  # noqa: N801
             )
             raise IndexError(msg)
 
-        with h5py.File(end_time_f, "r") as f:
+        with self._open(end_time_f) as f:
             dset = dataset_from_first_valid_path(f, self.end_time_path)
 
             size = dset.shape[0]
@@ -1,12 +1,8 @@
 from pathlib import Path
 
-import h5py
-import numpy as np
-
 from nxstacker.facility.facility import SPECS_DIR, FacilityInfo
 from nxstacker.utils.io import (
     dataset_from_first_valid_path,
-    files_first_exist,
 )
 from nxstacker.utils.parse import (
     add_timezone,
@@ -15,6 +11,28 @@ from nxstacker.utils.parse import (
 )
 
 
+def _mean_step(value_set):
+    """Return the mean step between consecutive values.
+
+    The differences telescope, so the mean step only depends on the
+    first and the last values along the last axis. It is the same as
+    np.diff(value_set).mean() without the array of differences.
+
+    Parameters
+    ----------
+    value_set : numpy.ndarray
+        the values, evenly or unevenly spaced
+
+    Returns
+    -------
+    step : float
+        the mean step
+
+    """
+    spans = value_set[..., -1] - value_set[..., 0]
+    return spans.mean() / (value_set.shape[-1] - 1)
+
+
 class I14(FacilityInfo):
     """Facility information for i14."""
 
@@ -63,7 +81,7 @@ class I14(FacilityInfo):
             Path(f"{raw_dir}/i14-{scan_id}.nxs"),
         ]
 
-        nxs_f = files_first_exist(nxs_candidates)
+        nxs_f = self.first_existing_file(nxs_candidates)
 
         if nxs_f is not None:
             return nxs_f
@@ -92,7 +110,7 @@ class I14(FacilityInfo):
             the rotation angle, in degree
 
         """
-        with h5py.File(rot_f, "r") as f:
+        with self._open(rot_f) as f:
             dset = dataset_from_first_valid_path(f, self.rotation_angle_path)
             rot_ang = dset[()]
 
@@ -112,7 +130,7 @@ class I14(FacilityInfo):
             the distance, in m
 
         """
-        with h5py.File(dist_f, "r") as f:
+        with self._open(dist_f) as f:
             dset = dataset_from_first_valid_path(
                 f, self.detector_distance_path
             )
@@ -134,13 +152,13 @@ class I14(FacilityInfo):
             the x pixel size, in m
 
         """
-        with h5py.File(px_f, "r") as f:
+        with self._open(px_f) as f:
             dset = dataset_from_first_valid_path(
                 f, self.sample_x_value_set_path
             )
             x_value_set = dset[()]
 
-        x_px_sz = np.diff(x_value_set).mean() * 1e-3
+        x_px_sz = _mean_step(x_value_set) * 1e-3
 
         return x_px_sz
 
@@ -158,13 +176,13 @@ class I14(FacilityInfo):
             the y pixel size, in m
 
         """
-        with h5py.File(px_f, "r") as f:
+        with self._open(px_f) as f:
             dset = dataset_from_first_valid_path(
                 f, self.sample_y_value_set_path
             )
             y_value_set = dset[()]
 
-        y_px_sz = np.diff(y_value_set).mean() * 1e-3
+        y_px_sz = _mean_step(y_value_set) * 1e-3
 
         return y_px_sz
 
@@ -185,7 +203,7 @@ class I14(FacilityInfo):
             timestamp of the start time, in ISO 8601
 
         """
-        with h5py.File(start_time_f, "r") as f:
+        with self._open(start_time_f) as f:
             dset = dataset_from_first_valid_path(f, self.start_time_path)
             start_time = dset[()]
 
@@ -213,7 +231,7 @@ class I14(FacilityInfo):
             timestamp of the end time, in ISO 8601
 
         """
-        with h5py.File(end_time_f, "r") as f:
+        with self._open(end_time_f) as f:
             dset = dataset_from_first_valid_path(f, self.end_time_path)
             end_time = dset[()]
 
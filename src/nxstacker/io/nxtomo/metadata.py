@@ -80,13 +80,15 @@ class MetadataPtycho(NXtomoMetadata):
 
     def fetch_metadata(self):
         """Find the metadata of the current projections and facility."""
-        self.title = self.title_from_scan()
-        self.sample_description = self.description_from_scan()
-        self.rotation_angle = self.find_rotation_angle()
-        self.detector_distance = self.find_detector_dist()
-        self.x_pixel_size, self.y_pixel_size = self.find_pixel_size()
-        self.start_time = self.start_time_from_scan()
-        self.end_time = self.end_time_from_scan()
+        # the same files are read for different items and projections
+        with self.facility.keeping_files_open():
+            self.title = self.title_from_scan()
+            self.sample_description = self.description_from_scan()
+            self.rotation_angle = self.find_rotation_angle()
+            self.detector_distance = self.find_detector_dist()
+            self.x_pixel_size, self.y_pixel_size = self.find_pixel_size()
+            self.start_time = self.start_time_from_scan()
+            self.end_time = self.end_time_from_scan()
 
     def title_from_scan(self):
         """Determine the tile from scan ID."""
@@ -222,13 +224,15 @@ class MetadataXRF(NXtomoMetadata):
 
     def fetch_metadata(self):
         """Find the metadata of the current projections and facility."""
-        self.title = self.title_from_scan()
-        self.sample_description = self.description_from_scan()
-        self.rotation_angle = self.find_rotation_angle()
-        self.detector_distance = self.find_detector_dist()
-        self.x_pixel_size, self.y_pixel_size = self.find_pixel_size()
-        self.start_time = self.start_time_from_scan()
-        self.end_time = self.end_time_from_scan()
+        # the same files are read for different items and projections
+        with self.facility.keeping_files_open():
+            self.title = self.title_from_scan()
+            self.sample_description = self.description_from_scan()
+            self.rotation_angle = self.find_rotation_angle()
+            self.detector_distance = self.find_detector_dist()
+            self.x_pixel_size, self.y_pixel_size = self.find_pixel_size()
+            self.start_time = self.start_time_from_scan()
+            self.end_time = self.end_time_from_scan()
 
     def title_from_scan(self):
         """Determine the tile from scan ID."""
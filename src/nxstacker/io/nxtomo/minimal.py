@@ -1,13 +1,15 @@
 import sys
 from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
 
+import blosc2
 import h5py
 import numpy as np
-from hdf5plugin import Blosc
+from hdf5plugin import Blosc2
 
 from nxstacker.utils.io import get_version, user_name
-from nxstacker.utils.model import UKtz
+from nxstacker.utils.model import CompressionCodec, UKtz
 
 ENTRY = "entry"
 DEF = "definition"
@@ -26,6 +28,7 @@ IMAGE_KEY = "image_key"
 X_PX_SZ = "x_pixel_size"
 Y_PX_SZ = "y_pixel_size"
 DIST = "distance"
+SCALE = "scale_factor"
 SAMPLE = "sample"
 SAMPLE_NAME = "name"
 ROT_ANGLE = "rotation_angle"
@@ -47,6 +50,15 @@ NX_PROCESS = NX_ENTRY / PROCESS
 LINK_DATA = NX_DETECTOR / DATA_DETECTOR
 LINK_ROT_ANG = NX_SAMPLE / ROT_ANGLE
 LINK_IMAGE_KEY = NX_DETECTOR / IMAGE_KEY
+LINK_SCALE = NX_DETECTOR / SCALE
+
+BLOSC_CLEVEL = 3
+# bit shuffle gives a slightly better ratio with zstd, while byte
+# shuffle is faster with lz4 for about the same ratio
+BLOSC_SHUFFLE = MappingProxyType({"zstd": "BITSHUFFLE", "lz4": "SHUFFLE"})
+# the file format of HDF5 1.10 or later, which indexes the chunks of a
+# fixed-size dataset with a fixed array instead of a B-tree
+LIBVER = ("v110", "latest")
 
 
 def create_minimal(
@@ -56,6 +68,7 @@ def create_minimal(
     facility,
     *,
     compress=False,
+    scale_factor=False,
     title=None,
     sample_description=None,
     detector_distance=None,
@@ -76,9 +89,16 @@ def create_minimal(
         the data type of the stack
     facility : FacilityInfo
         the facility information
-    compress : bool, optional
-        whether to apply compression (Blosc) to the NXtomo file. Default
+    compress : bool or str, optional
+        whether to apply compression (Blosc2) to the NXtomo file. It can
+        be the name of the codec, "zstd" for better compression ratio
+        or "lz4" for higher throughput, and True means "zstd". Default
         to False.
+    scale_factor : bool, optional
+        whether to create a scale factor for each projection, for
+        projections stored as quantised integers. The actual value of a
+        projection is its stored value multiplied by its scale factor.
+        Default to False.
     title : str, optional
         title of the file. Default to None, skip saving it.
     sample_description : str, optional
@@ -98,7 +118,7 @@ def create_minimal(
 
     nframe = stack_shape[0]
 
-    with h5py.File(file_nxtomo, "w") as f:
+    with h5py.File(file_nxtomo, "w", libver=LIBVER) as f:
         _create_entry(f, title=title, start_time=start_time, end_time=end_time)
 
         _create_instrument(f)
@@ -113,6 +133,7 @@ def create_minimal(
             y_pixel_size=y_pixel_size,
             detector_distance=detector_distance,
             compress=compress,
+            scale_factor=scale_factor,
         )
 
         _create_sample(f, nframe, sample_description=sample_description)
@@ -169,12 +190,17 @@ def _create_detector(
     detector_distance=None,
     *,
     compress=False,
+    scale_factor=False,
 ):
     grp_detector = root.create_group(str(NX_DETECTOR))
     grp_detector.attrs["NX_class"] = "NXdetector"
 
-    if compress:
-        compression_filter = Blosc("zstd", 9, Blosc.BITSHUFFLE)
+    if (cname := CompressionCodec.to_codec(compress)) is not None:
+        compression_filter = Blosc2(
+            cname=cname,
+            clevel=BLOSC_CLEVEL,
+            filters=getattr(Blosc2, BLOSC_SHUFFLE[cname]),
+        )
         compression = compression_filter.filter_id
         compression_opts = compression_filter.filter_options
     else:
@@ -193,6 +219,11 @@ def _create_detector(
 
     grp_detector[IMAGE_KEY] = np.zeros(stack_shape[0], dtype=int)
 
+    if scale_factor:
+        grp_detector.create_dataset(
+            SCALE, shape=(stack_shape[0],), dtype=np.float64, fillvalue=1.0
+        )
+
     if x_pixel_size is not None:
         grp_detector[X_PX_SZ] = x_pixel_size
         grp_detector[X_PX_SZ].attrs["units"] = "m"
@@ -206,6 +237,75 @@ def _create_detector(
         grp_detector[DIST].attrs["units"] = "m"
 
 
+def encode_chunk(proj, dtype, *, compress=False):
+    """Encode a projection as a chunk for direct writing.
+
+    The projection datasets are chunked by a single projection, so each
+    projection can be written with write_direct_chunk without going
+    through the HDF5 filter pipeline. If compression is applied, the
+    projection is compressed with Blosc2 here, using the same settings
+    as the filter of the dataset.
+
+    Parameters
+    ----------
+    proj : ndarray
+        the 2D projection, which should have the same shape as a chunk
+    dtype : type
+        the data type of the dataset
+    compress : bool or str, optional
+        whether the dataset is compressed, or the name of the codec.
+        Default to False.
+
+    Returns
+    -------
+    chunk : buffer
+        the encoded chunk
+
+    """
+    proj = np.ascontiguousarray(proj, dtype=dtype)[np.newaxis]
+
+    if (cname := CompressionCodec.to_codec(compress)) is None:
+        return proj
+
+    # the encoding holds the GIL, so the stacking threads cannot
+    # compress projections at the same time, instead the blocks of each
+    # projection are compressed by the threads of Blosc2
+    cparams = blosc2.CParams(
+        codec=blosc2.Codec[cname.upper()],
+        clevel=BLOSC_CLEVEL,
+        typesize=proj.itemsize,
+        nthreads=blosc2.nthreads,
+        filters=[blosc2.Filter[BLOSC_SHUFFLE[cname]]],
+    )
+    encoded = blosc2.asarray(proj, chunks=proj.shape, cparams=cparams)
+
+    return encoded.to_cframe()
+
+
+def map_virtual_data(root, sources):
+    """Map the projection dataset to the stored projections.
+
+    The projection dataset created in the minimal NXtomo file is
+    replaced by a virtual dataset with the same shape and data type,
+    so the projections are not copied into the NXtomo file.
+
+    Parameters
+    ----------
+    root : h5py.File
+        the NXtomo file opened in write mode
+    sources : iterable of h5py.VirtualSource
+        the 2D source of every projection, in the order of the stack
+
+    """
+    proj_dset = root[str(LINK_DATA)]
+    layout = h5py.VirtualLayout(shape=proj_dset.shape, dtype=proj_dset.dtype)
+    for k, source in enumerate(sources):
+        layout[k] = source
+
+    del root[str(LINK_DATA)]
+    root.create_virtual_dataset(str(LINK_DATA), layout)
+
+
 def _create_sample(root, nframe, sample_description=None):
     grp_sample = root.create_group(str(NX_SAMPLE))
     grp_sample.attrs["NX_class"] = "NXsample"
@@ -1,5 +1,8 @@
+from contextlib import contextmanager, nullcontext
 from types import MappingProxyType
 
+import h5py
+
 from nxstacker.utils.io import file_has_paths
 from nxstacker.utils.model import (
     Directory,
@@ -27,6 +30,7 @@ class ProjectionFile:
     id_scan = FixedValue()
     id_proj = FixedValue()
     id_angle = FixedValue()
+    _opened_file = None
 
     def __init__(
         self,
@@ -79,6 +83,49 @@ class ProjectionFile:
         self.description = description
         self.trim_proj = True
 
+    @classmethod
+    def from_open(cls, h5file, *args, **kwargs):
+        """Initialise an instance from an opened HDF5 file.
+
+        The opened file is used for everything read during the
+        initialisation, so the file is not reopened.
+
+        Parameters
+        ----------
+        h5file : h5py.File
+            the opened reconstruction file
+        args, kwargs
+            other arguments passed to the initialisation
+
+        """
+        instance = cls.__new__(cls)
+        with instance.reading(h5file):
+            instance.__init__(h5file.filename, *args, **kwargs)
+
+        return instance
+
+    @contextmanager
+    def reading(self, h5file):
+        """Read from an opened HDF5 file within the context.
+
+        Parameters
+        ----------
+        h5file : h5py.File
+            the opened reconstruction file
+
+        """
+        self._opened_file = h5file
+        try:
+            yield self
+        finally:
+            del self._opened_file
+
+    def _open(self):
+        """Open the file for reading, or reuse the file already opened."""
+        if self._opened_file is not None:
+            return nullcontext(self._opened_file)
+        return h5py.File(self._file_path, "r")
+
     def verify_file(self):
         """Check existence of some essential hdf5 paths."""
         return file_has_paths(self._file_path, self.essential_paths)
@@ -126,7 +126,7 @@ class PtyPyFile(ProjectionFile):
         raise TypeError(msg)
 
     def _compose_paths(self):
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             scans = list(f[self.path_names["scan_names"]])
 
             # assume one storage
@@ -159,20 +159,28 @@ class PtyPyFile(ProjectionFile):
         else:
             self._raw_dir = top_level_dir(self._file_path)
 
-    def object_complex(self, mode=0):
+    def object_complex(self, mode=0, out=None):
         """Return the complex object of a particular mode.
 
         Parameters
         ----------
         mode : int, optional
             the mode of the complex object to be returned. Default to 0.
+        out : ndarray, optional
+            the array to read the complex object into, which should
+            have the shape and the data type of the object. Default to
+            None, and a new array is allocated.
 
         """
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             ob = f[self._object_path]
 
             if mode < (num_modes := ob.shape[0]):
-                obj = ob[mode, :, :]
+                if out is None:
+                    obj = ob[mode, :, :]
+                else:
+                    ob.read_direct(out, source_sel=np.s_[mode, :, :])
+                    obj = out
             else:
                 mode_str = "mode" + "s" * (num_modes > 1)
                 msg = (
@@ -191,8 +199,38 @@ class PtyPyFile(ProjectionFile):
         """Return the object phase of a particular mode."""
         return np.angle(self.object_complex(mode=mode))
 
+    def object_virtual_source(self, kind, mode=0):
+        """Return the object as the source of a virtual dataset.
+
+        Only the complex object is stored in PtyPy file.
+
+        Parameters
+        ----------
+        kind : str
+            the kind of object, "complex", "modulus" or "phase"
+        mode : int, optional
+            the mode of the object. Default to 0.
+
+        Returns
+        -------
+        source : h5py.VirtualSource or None
+            the 2D source of the object, or None if the object is not
+            stored as it is in the file
+
+        """
+        if kind != "complex" or mode >= self.object_shape[0]:
+            return None
+
+        source = h5py.VirtualSource(
+            str(self._file_path),
+            self._object_path,
+            shape=self.object_shape,
+            dtype=self.object_complex_dtype,
+        )
+        return source[mode, :, :]
+
     def _ob_attr(self):
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             self.object_shape = f[self._object_path].shape
             self.object_complex_dtype = f[self._object_path].dtype
             self.pixel_size = f[self._px_sz_path][()].mean()
@@ -215,7 +253,7 @@ class PtyPyFile(ProjectionFile):
             the mode of the complex probe to be returned. Default to 0.
 
         """
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             pr = f[self._probe_path]
 
             if mode < (num_modes := pr.shape[0]):
@@ -239,7 +277,7 @@ class PtyPyFile(ProjectionFile):
         return np.angle(self.probe_complex(mode=mode))
 
     def _pr_attr(self):
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             self.probe_shape = f[self._probe_path].shape
             self.probe_complex_dtype = f[self._probe_path].dtype
 
@@ -118,7 +118,7 @@ class PtyREXFile(ProjectionFile):
         return id_scan
 
     def _retrieve_id_proj(self):
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             id_proj = f[self.path_names["id_proj"]][()]
 
         if isinstance(id_proj, bytes):
@@ -129,7 +129,7 @@ class PtyREXFile(ProjectionFile):
     def _overwrite_raw_dir(self):
         """Overwrite the _raw_dir attribute."""
         # check save_dir first
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             save_dir = f[self.path_names["save_dir"]][()]
         if isinstance(save_dir, bytes):
             save_dir = save_dir.decode()
@@ -172,7 +172,7 @@ class PtyREXFile(ProjectionFile):
             the mode of the object modulus to be returned. Default to 0.
 
         """
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             ob_mod = f[self.path_names["object_modulus"]]
 
             if mode < (num_modes := ob_mod.shape[0]):
@@ -205,7 +205,7 @@ class PtyREXFile(ProjectionFile):
             the mode of the object phase to be returned. Default to 0.
 
         """
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             ob_ang = f[self.path_names["object_phase"]]
 
             if mode < (num_modes := ob_ang.shape[0]):
@@ -229,9 +229,44 @@ class PtyREXFile(ProjectionFile):
 
         return ob_phase
 
+    def object_virtual_source(self, kind, mode=0):
+        """Return the object as the source of a virtual dataset.
+
+        Only the object modulus and phase are stored in PtyREX file,
+        and they can only be used if they are not trimmed.
+
+        Parameters
+        ----------
+        kind : str
+            the kind of object, "complex", "modulus" or "phase"
+        mode : int, optional
+            the mode of the object. Default to 0.
+
+        Returns
+        -------
+        source : h5py.VirtualSource or None
+            the 2D source of the object, or None if the object is not
+            stored as it is in the file
+
+        """
+        if (
+            kind not in {"modulus", "phase"}
+            or self.trim_proj
+            or mode >= self.object_shape[0]
+        ):
+            return None
+
+        source = h5py.VirtualSource(
+            str(self._file_path),
+            self.path_names[f"object_{kind}"],
+            shape=self.object_shape,
+            dtype=getattr(self, f"object_{kind}_dtype"),
+        )
+        return source[mode, 0, 0, 0, 0, :, :]
+
     def _ob_attr(self):
         pn = self.path_names
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             if self.trim_proj:
                 self.object_shape = self.object_phase().shape
             else:
@@ -266,7 +301,7 @@ class PtyREXFile(ProjectionFile):
             the mode of the probe modulus to be returned. Default to 0.
 
         """
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             pr_mod = f[self.path_names["probe_modulus"]]
 
             if mode < (num_modes := pr_mod.shape[0]):
@@ -291,7 +326,7 @@ class PtyREXFile(ProjectionFile):
             the mode of the probe phase to be returned. Default to 0.
 
         """
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             pr_ang = f[self.path_names["probe_phase"]]
 
             if mode < (num_modes := pr_ang.shape[0]):
@@ -309,7 +344,7 @@ class PtyREXFile(ProjectionFile):
 
     def _pr_attr(self):
         pn = self.path_names
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             self.probe_shape = f[pn["probe_modulus"]].shape
             self.probe_modulus_dtype = f[pn["probe_modulus"]].dtype
             self.probe_phase_dtype = f[pn["probe_phase"]].dtype
@@ -1,8 +1,6 @@
 import re
 from types import MappingProxyType
 
-import h5py
-
 from nxstacker.io.projection import ProjectionFile
 from nxstacker.utils.io import top_level_dir
 
@@ -119,7 +117,7 @@ class XRFWindowFile(ProjectionFile):
 
         """
         path = f"{self.path_names['processed']}/{transition}/data"
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             try:
                 dset = f[path]
             except KeyError:
@@ -147,7 +145,7 @@ class XRFWindowFile(ProjectionFile):
 
         """
         path = f"{self.path_names['processed']}/{transition}/data"
-        with h5py.File(self._file_path, "r") as f:
+        with self._open() as f:
             try:
                 dset = f[path]
             except KeyError:
@@ -24,13 +24,29 @@ HELP_ANGLE_LIST = "the file with rotation angles as the only column"
 HELP_EXCLUDE_ANGLE = "rotation angle(s) that should be excluded from"
 HELP_SORT_BY_ANGLE = "sort the projections by their rotation angles"
 HELP_PAD_TO_MAX = "pad projection to the maximum size of the stack"
-HELP_COMPRESS = "compress the NXtomo file"
+HELP_COMPRESS = (
+    "compress the NXtomo file, optionally with the codec zstd (default) "
+    "or lz4"
+)
 HELP_SAVE_COMPLEX = "save the complex result from ptychography"
 HELP_SAVE_MODULUS = "save the modulus result from ptychography"
+HELP_HALF_MODULUS = "store the modulus in half precision (float16)"
 HELP_SAVE_PHASE = "save the phase result from ptychography"
 HELP_UNWRAP_PHASE = "unwrap the phase"
 HELP_REMOVE_RAMP = "remove the phase ramp"
 HELP_MEDI_NORM = "normalise the phase by shifting its median"
+HELP_QUANT_PHASE = (
+    "quantise the phase as 16-bit integers with a scale factor for each "
+    "projection"
+)
+HELP_SKIP_CHECK = (
+    "determine the software of the projection files from their extension "
+    "without checking their content"
+)
+HELP_VIRTUAL = (
+    "map the stored projections as virtual datasets instead of copying "
+    "them, if there is no compression or processing"
+)
 HELP_TRANSITION = (
     "a comma-delimited string of transition in the format of "
     "<ELEMENT>-<TRANSITION>"
@@ -108,7 +124,12 @@ def _parser_common():
         "--pad-to-max", action="store_true", default=True, help=HELP_PAD_TO_MAX
     )
     parser.add_argument(
-        "--compress", action="store_true", default=False, help=HELP_COMPRESS
+        "--compress",
+        nargs="?",
+        const="zstd",
+        default=False,
+        choices=("zstd", "lz4"),
+        help=HELP_COMPRESS,
     )
 
     return parser
@@ -140,6 +161,12 @@ def _parser_ptycho(subparsers, **kwargs):
         default=False,
         help=HELP_SAVE_MODULUS,
     )
+    subparser.add_argument(
+        "--half-modulus",
+        action="store_true",
+        default=False,
+        help=HELP_HALF_MODULUS,
+    )
     subparser.add_argument(
         "--save-phase", action="store_true", default=True, help=HELP_SAVE_PHASE
     )
@@ -158,9 +185,24 @@ def _parser_ptycho(subparsers, **kwargs):
         default=False,
         help=HELP_UNWRAP_PHASE,
     )
+    subparser.add_argument(
+        "--quantise-phase",
+        action="store_true",
+        default=False,
+        help=HELP_QUANT_PHASE,
+    )
     subparser.add_argument(
         "--rescale", action="store_true", default=False, help=NIMPL
     )
+    subparser.add_argument(
+        "--skip-proj-file-check",
+        action="store_true",
+        default=False,
+        help=HELP_SKIP_CHECK,
+    )
+    subparser.add_argument(
+        "--virtual", action="store_true", default=False, help=HELP_VIRTUAL
+    )
 
 
 def _display_version_str():
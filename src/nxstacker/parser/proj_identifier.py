@@ -1,6 +1,6 @@
 import re
-from collections import deque
 from functools import cached_property
+from itertools import chain
 from pathlib import Path
 
 import numpy as np
@@ -93,7 +93,6 @@ class ProjIdentifier:
         self.from_range = []
         self.from_file = []
         self.exclude = []
-        self.identifiers = deque()
         self.id_type = id_type
 
         if from_range is not None:
@@ -105,16 +104,12 @@ class ProjIdentifier:
         if exclude is not None:
             self.exclude = generate_numbers(exclude, self.id_type)
 
-        # retain order, a bit inefficient
-        merged = list(dict.fromkeys(self.from_range)) + list(
-            dict.fromkeys(self.from_file)
+        # retain order while removing duplicates
+        merged = dict.fromkeys(chain(self.from_range, self.from_file))
+        exclude = set(self.exclude)
+        self.identifiers = tuple(
+            entry for entry in merged if entry not in exclude
         )
-        merged = list(dict.fromkeys(merged))
-        for entry in merged:
-            if entry not in self.exclude:
-                self.identifiers.append(entry)
-
-        self.identifiers = tuple(self.identifiers)
 
     def id_from_range(self, specifier):
         """Return numbers from <START>[-<END>[:<STEP>]]."""
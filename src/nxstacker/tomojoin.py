@@ -93,9 +93,11 @@ def tomojoin(
         whether to pad the individual projection if it is not at the
         maximum size of the stack. Default to True. If it is False
         and there is inconsistent size, RuntimeError is raised.
-    compress : bool, optional
-        whether to apply compression (Blosc) to the NXtomo file.
-        Default to False.
+    compress : bool or str, optional
+        whether to apply compression (Blosc2) to the NXtomo file. It can
+        be the name of the codec, "zstd" for better compression ratio
+        or "lz4" for higher throughput, and True means "zstd". Default
+        to False.
     quiet : bool, optional
         whether to suppress log message. Default to False.
     dry_run : bool, optional
@@ -60,9 +60,9 @@ def select_tomo_expt(
         whether to pad a projection to the maximum size of the stack.
         Default to True. If this is False and there is a projection with
         inconsistent size, it will terminate.
-    compress : bool, optional
-        whether to apply compression on the NXtomo file. Default to
-        False.
+    compress : bool or str, optional
+        whether to apply compression on the NXtomo file, or the name of
+        the codec ("zstd" or "lz4"). Default to False.
     kwargs : dict, optional
         optional arguments to different types of experiments
 
@@ -1,3 +1,4 @@
+import os
 import re
 import subprocess
 from importlib.metadata import PackageNotFoundError, version
@@ -154,3 +155,22 @@ def get_version():
     except PackageNotFoundError:
         ver = "dev"
     return ver
+
+
+def available_cpus():
+    """Get the number of CPUs the current process can run on.
+
+    It respects the CPU affinity, e.g. set by a batch scheduler, if it
+    is supported by the platform.
+
+    Returns
+    -------
+    num_cpus : int
+        the number of usable CPUs, at least 1
+
+    """
+    try:
+        num_cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        num_cpus = os.cpu_count()
+    return num_cpus or 1
@@ -6,6 +6,7 @@ import xraylib
 
 from nxstacker.parser.proj_identifier import generate_numbers
 from nxstacker.utils.facility import choose_facility_info
+from nxstacker.utils.parse import quote_iterable
 
 
 class UKtz(tzinfo):
@@ -224,7 +225,8 @@ class IdentifierRange(FixedValue):
         elif isinstance(value, str):
             id_rng = generate_numbers(value, dtype=self.num_type)
         else:
-            id_rng = tuple(value)
+            # any iterable, it is only consumed once below
+            id_rng = value
 
         id_rng_as_str = tuple(str(k) for k in id_rng)
         setattr(instance, self.private_name, id_rng_as_str)
@@ -284,6 +286,52 @@ class PositiveNumber(FixedValue):
         setattr(instance, self.private_name, num)
 
 
+class CompressionCodec(FixedValue):
+    """Represent the Blosc codec used to compress the NXtomo file."""
+
+    codecs = ("zstd", "lz4")
+    default = "zstd"
+
+    def __set__(self, instance, value):
+        if hasattr(instance, self.private_name):
+            msg = f"can't set attribute '{self.public_name}'"
+            raise AttributeError(msg)
+
+        setattr(instance, self.private_name, self.to_codec(value))
+
+    @classmethod
+    def to_codec(cls, value):
+        """Convert the compression option to the name of the codec.
+
+        Parameters
+        ----------
+        value : bool, str or None
+            the compression option. False or None means no compression,
+            True means the default codec, otherwise it should be the
+            name of one of the supported codecs.
+
+        Returns
+        -------
+        the name of the codec, or None if there is no compression
+
+        """
+        if value is None or value is False:
+            return None
+        if value is True:
+            return cls.default
+
+        codec = str(value).lower()
+        if codec not in cls.codecs:
+            cd = quote_iterable(cls.codecs)
+            msg = (
+                f"The compression codec '{value}' is not supported. "
+                f"Currently it supports {cd}."
+            )
+            raise ValueError(msg)
+
+        return codec
+
+
 class XRFTransitionList(FixedValue):
     """Represent a list of XRF transition."""
 
@@ -2,7 +2,7 @@ import numpy as np
 from skimage.restoration import unwrap_phase as unwrap
 
 
-def unwrap_phase(phase):
+def unwrap_phase(phase, out=None):
     """Unwrap the phase.
 
     This is taken from PtychographyTools.
@@ -11,6 +11,9 @@ def unwrap_phase(phase):
     ----------
     phase : ndarray
         the phase image
+    out : ndarray, optional
+        the array to store the unwrapped phase image, it can be the
+        phase image itself. Default to None, a new array is allocated.
 
     Returns
     -------
@@ -18,13 +21,20 @@ def unwrap_phase(phase):
         the unwrapped phase image
 
     """
+    # the unwrapping is done in double precision, it is then cast back
+    # to the precision of the phase image
     unwrapped = unwrap(phase)
+    if out is None:
+        out = np.empty(phase.shape, dtype=phase.dtype)
 
-    # reverse the sign of phase when the % of positive is less than half
-    if np.count_nonzero(unwrapped > 0) / unwrapped.size < 0.5:
-        unwrapped *= -1
+    # reverse the sign of phase when the % of positive is less than half,
+    # in the same pass as the cast
+    if 2 * np.count_nonzero(unwrapped > 0) < unwrapped.size:
+        np.negative(unwrapped, out=out, casting="same_kind")
+    else:
+        np.copyto(out, unwrapped, casting="same_kind")
 
-    return unwrapped
+    return out
 
 
 def remove_phase_ramp(arr):
@@ -35,3 +45,100 @@ def remove_phase_ramp(arr):
 def phase_shift(arr, shift):
     """Phase shift."""
     return arr * np.exp(1j * shift)
+
+
+def phase_median(phase, scratch=None):
+    """Find the median of the phase.
+
+    The result is the same as np.median for phase without NaN, but only
+    one partition is done on a copy of the phase, so an even number of
+    pixels does not need a second partition.
+
+    Parameters
+    ----------
+    phase : ndarray
+        the phase image
+    scratch : ndarray, optional
+        the array with the same size as the phase to be partitioned.
+        Default to None, a copy of the phase is allocated.
+
+    Returns
+    -------
+    median : float
+        the median of the phase
+
+    """
+    if scratch is None:
+        scratch = np.empty(phase.shape, dtype=phase.dtype)
+    np.copyto(scratch, phase)
+
+    flat = scratch.reshape(-1)
+    mid = flat.size // 2
+    flat.partition(mid)
+    if flat.size % 2:
+        return flat[mid]
+
+    # the other middle value is the maximum of the lower partition
+    return (flat[:mid].max() + flat[mid]) / 2
+
+
+def shift_wrapped_phase(phase, shift):
+    """Shift the wrapped phase in-place.
+
+    This is equivalent to taking the phase after phase shifting the
+    complex array, without computing the complex exponential.
+
+    Parameters
+    ----------
+    phase : ndarray
+        the wrapped phase image, in the range of [-pi, pi]
+    shift : float
+        the phase shift
+
+    Returns
+    -------
+    phase : ndarray
+        the phase image after shifting, wrapped in the range of
+        [-pi, pi)
+
+    """
+    phase -= shift - np.pi
+    np.remainder(phase, 2 * np.pi, out=phase)
+    phase -= np.pi
+    return phase
+
+
+def quantise_phase(phase, scratch=None):
+    """Quantise the phase as 16-bit integers.
+
+    Parameters
+    ----------
+    phase : ndarray
+        the phase image
+    scratch : ndarray, optional
+        the array with the same shape as the phase to hold the scaled
+        phase before it is rounded. Default to None, a new array is
+        allocated.
+
+    Returns
+    -------
+    quantised : ndarray
+        the phase image in int16
+    scale : float
+        the scale factor, the phase is quantised * scale
+
+    """
+    # the largest magnitude from the extrema, without an array of the
+    # absolute values
+    peak = max(float(phase.max(initial=0)), -float(phase.min(initial=0)))
+    scale = peak / np.iinfo(np.int16).max if peak > 0 else 1.0
+
+    # scale into the scratch array, then round it into the integers
+    if scratch is None:
+        scratch = np.empty(phase.shape, dtype=phase.dtype)
+    np.multiply(phase, 1 / scale, out=scratch)
+
+    quantised = np.empty(phase.shape, dtype=np.int16)
+    np.rint(scratch, out=quantised, casting="unsafe")
+
+    return quantised, scale
@@ -1,3 +1,5 @@
+import logging
+
 import h5py
 import numpy as np
 import pytest
@@ -57,6 +59,48 @@ def y_px_size():
     return 1.23e-9
 
 
+@pytest.fixture()
+def i14_ptypy(
+    tmp_path,
+    start_scan,
+    end_scan,
+    visit_id,
+    detector_distance,
+    sample_name,
+    rotation_angle,
+    sample_x_value_set,
+    sample_y_value_set,
+    x_px_size,
+    y_px_size,
+):
+    # prepare i14 raw data directory structure
+    prep_i14 = PrepareI14(
+        tmp_path,
+        start_scan,
+        end_scan,
+        visit_id=visit_id,
+        detector_distance=detector_distance,
+        sample_name=sample_name,
+        rotation_angle=rotation_angle,
+        sample_x_value_set=sample_x_value_set,
+        sample_y_value_set=sample_y_value_set,
+    )
+    prep_i14.write_dummy_raw()
+
+    # prepare projection files from PtyPy
+    ptypy_prep = PreparePtyPyFile(
+        tmp_path,
+        scan_num=prep_i14.scan_num,
+        raw_files=prep_i14.raw_files,
+        ob_shape=(sample_y_value_set.size, sample_x_value_set.size),
+        x_px_size=x_px_size,
+        y_px_size=y_px_size,
+    )
+    ptypy_prep.write_dummy_proj()
+
+    return prep_i14, ptypy_prep
+
+
 def test_ptycho_i14_from_dir(
     tmp_path,
     start_scan,
@@ -252,3 +296,279 @@ def test_ptycho_i14_from_file_placeholder(
 
     with h5py.File(nxtomo_phas, "r") as f:
         assert f["/entry/data/data"].dtype == np.float32
+
+
+def test_ptycho_i14_virtual(
+    tmp_path,
+    i14_ptypy,
+    start_scan,
+    end_scan,
+    rotation_angle,
+    sample_x_value_set,
+    sample_y_value_set,
+):
+    _, ptypy_prep = i14_ptypy
+
+    # stack
+    nxtomo_files = tomojoin(
+        "ptychography",
+        proj_dir=ptypy_prep.proj_dir,
+        nxtomo_dir=str(tmp_path),
+        from_scan=f"{start_scan}-{end_scan}",
+        save_phase=True,
+        save_complex=True,
+        facility="i14",
+        virtual=True,
+    )
+
+    assert len(nxtomo_files) == 2
+
+    nxtomo_cplx = nxtomo_files[0]
+    nxtomo_phas = nxtomo_files[1]
+    num_scans = end_scan - start_scan + 1
+
+    # only the complex object is stored in PtyPy file
+    with h5py.File(nxtomo_cplx, "r") as f:
+        assert f["/entry/data/data"].is_virtual
+        assert f["/entry/data/data"].shape == (
+            num_scans,
+            sample_y_value_set.size,
+            sample_x_value_set.size,
+        )
+        assert np.isclose(
+            f["/entry/data/rotation_angle"][()],
+            np.array([rotation_angle] * num_scans),
+        ).all()
+
+        with h5py.File(ptypy_prep.proj_files[0], "r") as proj:
+            obj = proj["/content/obj/Smy_sampleG00/data"][0]
+        assert np.allclose(f["/entry/data/data"][0], obj)
+
+    with h5py.File(nxtomo_phas, "r") as f:
+        assert not f["/entry/data/data"].is_virtual
+
+
+@pytest.mark.parametrize("compress", ["zstd", "lz4"])
+def test_ptycho_i14_compress(
+    tmp_path,
+    compress,
+    i14_ptypy,
+    start_scan,
+    end_scan,
+):
+    _, ptypy_prep = i14_ptypy
+
+    # stack
+    nxtomo_files = tomojoin(
+        "ptychography",
+        proj_dir=ptypy_prep.proj_dir,
+        nxtomo_dir=str(tmp_path),
+        from_scan=f"{start_scan}-{end_scan}",
+        save_phase=False,
+        save_modulus=True,
+        save_complex=True,
+        compress=compress,
+        facility="i14",
+    )
+
+    assert len(nxtomo_files) == 2
+
+    nxtomo_cplx = nxtomo_files[0]
+    nxtomo_modl = nxtomo_files[1]
+
+    with h5py.File(ptypy_prep.proj_files[0], "r") as proj:
+        obj = proj["/content/obj/Smy_sampleG00/data"][0]
+
+    # the chunks written directly are decoded by the filter
+    with h5py.File(nxtomo_cplx, "r") as f:
+        assert f["/entry/data/data"].chunks == (1, *obj.shape)
+        assert np.allclose(f["/entry/data/data"][0], obj)
+
+    with h5py.File(nxtomo_modl, "r") as f:
+        assert np.allclose(f["/entry/data/data"][0], np.abs(obj))
+
+
+def test_ptycho_i14_quiet_warns(
+    tmp_path,
+    caplog,
+    i14_ptypy,
+    start_scan,
+    end_scan,
+):
+    _, ptypy_prep = i14_ptypy
+
+    # stack quietly
+    tomojoin(
+        "ptychography",
+        proj_dir=ptypy_prep.proj_dir,
+        nxtomo_dir=str(tmp_path),
+        from_scan=f"{start_scan}-{end_scan}",
+        save_phase=True,
+        remove_ramp=True,
+        rescale=True,
+        facility="i14",
+        quiet=True,
+    )
+
+    # the info messages are suppressed but not the warnings
+    levels = {record.levelno for record in caplog.records}
+    messages = [record.getMessage() for record in caplog.records]
+    assert levels == {logging.WARNING}
+    assert "Phase ramp removal is not yet implemented." in messages
+    assert "Rescale is not yet implemented." in messages
+
+
+def test_ptycho_i14_quantise_phase(tmp_path, i14_ptypy, start_scan, end_scan):
+    _, ptypy_prep = i14_ptypy
+
+    # stack the phase as floats and as integers
+    nxtomo_phas = {}
+    for quantise in (False, True):
+        nxtomo_dir = tmp_path / f"quantise_{quantise}"
+        nxtomo_dir.mkdir()
+        (nxtomo_phas[quantise],) = tomojoin(
+            "ptychography",
+            proj_dir=ptypy_prep.proj_dir,
+            nxtomo_dir=str(nxtomo_dir),
+            from_scan=f"{start_scan}-{end_scan}",
+            save_phase=True,
+            quantise_phase=quantise,
+            facility="i14",
+        )
+
+    with h5py.File(nxtomo_phas[False], "r") as f:
+        phase = f["/entry/data/data"][()]
+        assert "scale_factor" not in f["/entry/instrument/detector"]
+
+    with h5py.File(nxtomo_phas[True], "r") as f:
+        assert f["/entry/data/data"].dtype == np.int16
+        quantised = f["/entry/data/data"][()]
+        scale = f["/entry/instrument/detector/scale_factor"][()]
+
+    # one scale factor for each projection, within a step of the phase
+    assert scale.shape == (phase.shape[0],)
+    restored = quantised * scale[:, np.newaxis, np.newaxis]
+    assert (np.abs(restored - phase) <= scale[:, np.newaxis, np.newaxis]).all()
+
+
+def test_ptycho_i14_half_modulus(tmp_path, i14_ptypy, start_scan, end_scan):
+    _, ptypy_prep = i14_ptypy
+
+    # stack the modulus in single and half precision
+    nxtomo_modl = {}
+    for half in (False, True):
+        nxtomo_dir = tmp_path / f"half_{half}"
+        nxtomo_dir.mkdir()
+        (nxtomo_modl[half],) = tomojoin(
+            "ptychography",
+            proj_dir=ptypy_prep.proj_dir,
+            nxtomo_dir=str(nxtomo_dir),
+            from_scan=f"{start_scan}-{end_scan}",
+            save_phase=False,
+            save_modulus=True,
+            half_modulus=half,
+            facility="i14",
+        )
+
+    with h5py.File(nxtomo_modl[False], "r") as f:
+        assert f["/entry/data/data"].dtype == np.float32
+        modulus = f["/entry/data/data"][()]
+
+    with h5py.File(nxtomo_modl[True], "r") as f:
+        assert f["/entry/data/data"].dtype == np.float16
+        half_modulus = f["/entry/data/data"][()]
+
+    # within the precision of float16
+    assert np.allclose(half_modulus, modulus, rtol=1e-3, atol=1e-4)
+
+
+def test_ptycho_i14_skip_proj_file_check(
+    tmp_path,
+    i14_ptypy,
+    start_scan,
+    end_scan,
+    sample_x_value_set,
+    sample_y_value_set,
+):
+    _, ptypy_prep = i14_ptypy
+
+    # a file which is not HDF5 is still skipped
+    (ptypy_prep.proj_dir / "scan_not_hdf5.ptyr").write_text("")
+
+    # stack
+    nxtomo_files = tomojoin(
+        "ptychography",
+        proj_dir=ptypy_prep.proj_dir,
+        nxtomo_dir=str(tmp_path),
+        from_scan=f"{start_scan}-{end_scan}",
+        save_phase=True,
+        facility="i14",
+        skip_proj_file_check=True,
+    )
+
+    assert len(nxtomo_files) == 1
+
+    num_scans = end_scan - start_scan + 1
+    with h5py.File(nxtomo_files[0], "r") as f:
+        assert f["/entry/data/data"].shape == (
+            num_scans,
+            sample_y_value_set.size,
+            sample_x_value_set.size,
+        )
+
+    # but a HDF5 file trusted by its extension has to be a reconstruction
+    with h5py.File(ptypy_prep.proj_dir / "scan_not_ptypy.ptyr", "w") as f:
+        f["/content/dummy"] = 0
+
+    with pytest.raises(KeyError, match="not a reconstruction from PtyPy"):
+        tomojoin(
+            "ptychography",
+            proj_dir=ptypy_prep.proj_dir,
+            nxtomo_dir=str(tmp_path),
+            from_scan=f"{start_scan}-{end_scan}",
+            save_phase=True,
+            facility="i14",
+            skip_proj_file_check=True,
+        )
+
+
+def test_ptycho_i14_missing_angle(
+    tmp_path,
+    caplog,
+    i14_ptypy,
+    start_scan,
+    end_scan,
+    rotation_angle,
+):
+    _, ptypy_prep = i14_ptypy
+
+    # one angle within the tolerance of the rotation angle, one not
+    within_tol = rotation_angle - 5e-4
+    beyond_tol = rotation_angle + 1e-2
+    angle_list = tmp_path / "angle_list.txt"
+    angle_list.write_text(f"{within_tol}\n{beyond_tol}\n")
+
+    # stack
+    nxtomo_files = tomojoin(
+        "ptychography",
+        proj_dir=ptypy_prep.proj_dir,
+        nxtomo_dir=str(tmp_path),
+        from_scan=f"{start_scan}-{end_scan}",
+        angle_list=angle_list,
+        save_phase=True,
+        facility="i14",
+        quiet=True,
+    )
+
+    num_scans = end_scan - start_scan + 1
+    with h5py.File(nxtomo_files[0], "r") as f:
+        assert f["/entry/data/rotation_angle"].size == num_scans
+
+    # only the angle beyond the tolerance is missing
+    (missing,) = [
+        record.getMessage()
+        for record in caplog.records
+        if "rotation angle" in record.getMessage()
+    ]
+    assert f"'{beyond_tol}'" in missing
+    assert f"'{within_tol}'" not in missing
@@ -0,0 +1,162 @@
+from types import SimpleNamespace
+
+import h5py
+import numpy as np
+import pytest
+from nxstacker.facility.facility import AccumulatedDict, FacilityInfo
+from nxstacker.facility.i13_1 import I13_1
+
+from tests.fake_fs.prepare_facility import PrepareI13_1
+
+
+def test_accumulated_dict_or_leaves_operands():
+    a = AccumulatedDict({"paths": ["/a"], "name": "a"})
+    b = {"paths": ["/b"], "name": "b", "extra": 1}
+
+    merged = a | b
+
+    assert merged == {"paths": ["/a", "/b"], "name": "b", "extra": 1}
+    assert a == {"paths": ["/a"], "name": "a"}
+    assert b == {"paths": ["/b"], "name": "b", "extra": 1}
+
+
+def test_accumulated_dict_or_chained():
+    a = AccumulatedDict({"paths": ["/a"]})
+
+    merged = a | {"paths": ["/b"]} | {"paths": ["/c"]}
+
+    assert isinstance(merged, AccumulatedDict)
+    assert merged["paths"] == ["/a", "/b", "/c"]
+    assert a["paths"] == ["/a"]
+
+
+def test_accumulated_dict_ior():
+    a = AccumulatedDict({"paths": ["/a"], "num": 1})
+    a |= {"paths": ["/b"], "num": 2}
+
+    assert a == {"paths": ["/a", "/b"], "num": [1, 2]}
+
+
+@pytest.fixture()
+def hdf5_files(tmp_path):
+    file_paths = []
+    for k in range(3):
+        fp = tmp_path / f"file_{k}.h5"
+        with h5py.File(fp, "w") as f:
+            f["data"] = k
+        file_paths.append(fp)
+    return file_paths
+
+
+def test_keeping_files_open(hdf5_files):
+    facility = FacilityInfo()
+    with facility.keeping_files_open():
+        with facility._open(hdf5_files[0]) as f:
+            first = f
+        # the file is still open after the read and it is reused
+        assert first.id.valid
+        with facility._open(hdf5_files[0]) as f:
+            assert f is first
+
+    assert not first.id.valid
+    assert facility._open_files is None
+
+
+def test_keeping_files_open_evicts_least_recent(hdf5_files):
+    facility = FacilityInfo()
+    facility.max_open_files = 2
+    with facility.keeping_files_open():
+        with facility._open(hdf5_files[0]) as f0:
+            pass
+        with facility._open(hdf5_files[1]) as f1:
+            pass
+        # the first file is used again, so the second one is the least
+        # recently used when the third one is opened
+        with facility._open(hdf5_files[0]):
+            pass
+        with facility._open(hdf5_files[2]) as f2:
+            assert f2["data"][()] == 2
+
+        assert f0.id.valid
+        assert not f1.id.valid
+        assert list(facility._open_files) == [hdf5_files[0], hdf5_files[2]]
+
+
+def test_keeping_files_open_nested(hdf5_files):
+    facility = FacilityInfo()
+    with facility.keeping_files_open():
+        with facility._open(hdf5_files[0]) as f0:
+            pass
+        with (
+            facility.keeping_files_open(),
+            facility._open(hdf5_files[1]) as f1,
+        ):
+            pass
+
+        # the files are kept until the outermost context exits
+        assert f0.id.valid
+        assert f1.id.valid
+        with facility._open(hdf5_files[0]) as f:
+            assert f is f0
+
+    assert not f0.id.valid
+    assert not f1.id.valid
+
+
+def test_first_existing_file(tmp_path):
+    facility = FacilityInfo()
+    preferred = tmp_path / "preferred.nxs"
+    fallback = tmp_path / "fallback.nxs"
+    candidates = [preferred, fallback]
+
+    # a miss is not remembered
+    assert facility.first_existing_file(candidates) is None
+    fallback.touch()
+    assert facility.first_existing_file(candidates) == fallback
+
+    # the file found is remembered until the cache is cleared
+    preferred.touch()
+    assert facility.first_existing_file(candidates) == fallback
+    facility.clear_file_cache()
+    assert facility.first_existing_file(candidates) == preferred
+
+    # a removed file is not returned
+    preferred.unlink()
+    assert facility.first_existing_file(candidates) == fallback
+    fallback.unlink()
+    assert facility.first_existing_file(candidates) is None
+
+
+def test_i13_1_rotation_angle_of_scans_in_different_sizes(tmp_path):
+    # the scans differ in the number of projections and positions
+    scans = {
+        100: PrepareI13_1(
+            tmp_path,
+            100,
+            0,
+            2,
+            rotation_angle=-10.5,
+            sample_x_value_set=np.linspace(-14, 14, num=21),
+        ),
+        101: PrepareI13_1(
+            tmp_path,
+            101,
+            0,
+            4,
+            rotation_angle=20.25,
+            sample_x_value_set=np.linspace(-14, 14, num=11),
+        ),
+    }
+    for prep in scans.values():
+        prep.write_dummy_raw()
+
+    facility = I13_1()
+    for _ in range(2):
+        # alternate between the scans
+        for scan, prep in scans.items():
+            for proj in prep.projs:
+                proj_file = SimpleNamespace(
+                    raw_dir=prep.visit, id_scan=str(scan), id_proj=str(proj)
+                )
+                rot_ang = facility.rotation_angle(prep.pty_tomo_f, proj_file)
+                assert np.isclose(rot_ang, prep.rotation_angle)
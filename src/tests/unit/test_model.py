@@ -0,0 +1,50 @@
+import sys
+
+import blosc2
+import numpy as np
+import pytest
+from nxstacker.io.nxtomo.minimal import BLOSC_SHUFFLE, encode_chunk
+from nxstacker.parser.parser import parse_tomo
+from nxstacker.utils.model import CompressionCodec
+
+
+@pytest.mark.parametrize(
+    ("value", "codec"),
+    [
+        (None, None),
+        (False, None),
+        (True, "zstd"),
+        ("zstd", "zstd"),
+        ("LZ4", "lz4"),
+    ],
+)
+def test_compression_codec(value, codec):
+    assert CompressionCodec.to_codec(value) == codec
+
+
+@pytest.mark.parametrize("value", ["gzip", "blosclz", ""])
+def test_compression_codec_not_supported(value):
+    with pytest.raises(ValueError, match="is not supported"):
+        CompressionCodec.to_codec(value)
+
+
+def test_compress_flag_not_supported(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["tomojoin", "ptycho", "--compress=gzip"])
+
+    with pytest.raises(SystemExit):
+        parse_tomo()
+
+
+@pytest.mark.parametrize(
+    ("codec", "shuffle"),
+    [("zstd", blosc2.Filter.BITSHUFFLE), ("lz4", blosc2.Filter.SHUFFLE)],
+)
+def test_compression_shuffle(codec, shuffle):
+    assert BLOSC_SHUFFLE[codec] == shuffle.name
+
+    proj = np.arange(64, dtype=np.float32).reshape(8, 8)
+    chunk = encode_chunk(proj, proj.dtype, compress=codec)
+    cparams = blosc2.ndarray_from_cframe(chunk).schunk.cparams
+
+    assert cparams.codec == blosc2.Codec[codec.upper()]
+    assert cparams.filters[0] == shuffle
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from nxstacker.utils.ptychography import phase_median, shift_wrapped_phase
+
+
+@pytest.mark.parametrize("shape", [(5, 7), (6, 8), (1, 1), (1, 2)])
+def test_phase_median_as_np_median(shape):
+    rng = np.random.default_rng()
+    phase = rng.uniform(-np.pi, np.pi, shape).astype(np.float32)
+    original = phase.copy()
+
+    assert np.isclose(phase_median(phase), np.median(phase))
+    assert np.array_equal(phase, original)
+
+    # the same with a scratch array
+    scratch = np.empty_like(phase)
+    assert np.isclose(phase_median(phase, scratch=scratch), np.median(phase))
+
+
+def test_phase_median_with_repeated_values():
+    phase = np.array([[3.0, 1.0, 1.0], [2.0, 1.0, 3.0]])
+
+    assert phase_median(phase) == np.median(phase)
+
+
+@pytest.mark.parametrize("shift", [0.0, 0.3, -1.2, np.pi, -np.pi, 2.5 * np.pi])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_shift_wrapped_phase_as_complex_shift(shift, dtype):
+    # include the boundaries and the values next to them
+    eps = np.finfo(dtype).eps * 8
+    boundaries = [-np.pi, -np.pi + eps, np.pi - eps, np.pi]
+    rng = np.random.default_rng()
+    phase = np.concatenate(
+        [boundaries, rng.uniform(-np.pi, np.pi, 100)]
+    ).astype(dtype)
+    expected = np.angle(np.exp(1j * (phase.astype(np.float64) - shift)))
+
+    shifted = shift_wrapped_phase(phase, shift)
+
+    # in-place and wrapped
+    assert shifted is phase
+    assert (np.abs(shifted) <= np.pi + eps).all()
+
+    # the same angle, where -pi and pi are the same at the boundary
+    diff = np.angle(np.exp(1j * (shifted - expected)))
+    assert np.allclose(diff, 0, atol=1e-5)
+
+    away = np.abs(expected) < np.pi - 1e-3
+    assert np.allclose(shifted[away], expected[away], atol=1e-5)
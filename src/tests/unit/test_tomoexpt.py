@@ -0,0 +1,94 @@
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from nxstacker.experiment.tomoexpt import TomoExpt, _pad_width
+
+
+@pytest.fixture()
+def tomo_expt():
+    # only the options used by resizing the projections
+    expt = TomoExpt.__new__(TomoExpt)
+    expt._pad_to_max = True
+    return expt
+
+
+@pytest.mark.parametrize(
+    ("proj_shape", "stack_shape", "in_place"),
+    [
+        # odd and even padding
+        ((5, 7), (8, 10), True),
+        ((5, 7), (9, 11), True),
+        # no padding in an axis or on an edge
+        ((6, 8), (9, 8), True),
+        ((6, 8), (6, 13), True),
+        ((4, 4), (5, 5), True),
+        # the padding is wider than the projection
+        ((2, 3), (9, 10), False),
+    ],
+)
+def test_resize_proj_as_np_pad(tomo_expt, proj_shape, stack_shape, in_place):
+    rng = np.random.default_rng()
+    proj = rng.random(proj_shape, dtype=np.float32)
+    pad_width = _pad_width(proj_shape, stack_shape)
+    expected = np.pad(proj, pad_width, mode="symmetric")
+
+    out = np.full(stack_shape, np.nan, dtype=proj.dtype)
+    resized = tomo_expt._resize_proj(proj, (1, *stack_shape), out=out)
+
+    assert (resized is out) == in_place
+    assert np.array_equal(resized, expected)
+
+
+def test_pad_symmetric_into_with_zero_pad_width():
+    proj = np.arange(12, dtype=np.float64).reshape(3, 4)
+    out = np.empty((3, 4))
+    padded = TomoExpt._pad_symmetric_into(proj, out, (0, 0), (0, 0))
+
+    assert padded is out
+    assert np.array_equal(padded, proj)
+
+
+def test_resize_proj_without_padding(tomo_expt):
+    proj = np.ones((4, 5))
+
+    assert tomo_expt._resize_proj(proj, (1, 4, 5)) is proj
+    assert tomo_expt._resize_proj(proj, (1, 3, 5)) is proj
+
+
+def _expt_with_angles(num_projs, angles, *, sort_by_angle=False):
+    # only the attributes used by arranging the projections by angle
+    expt = TomoExpt.__new__(TomoExpt)
+    expt._projections = [
+        SimpleNamespace(id_scan=k, _id_angle=None) for k in range(num_projs)
+    ]
+    expt._metadata = SimpleNamespace(rotation_angle=angles)
+    expt._sort_by_angle = sort_by_angle
+    expt._include_angle = ()
+    expt._logger = logging.getLogger(__name__)
+    return expt
+
+
+def test_arrange_by_angle():
+    expt = _expt_with_angles(3, [30.0, -10.0, 20.0], sort_by_angle=True)
+    expt._arrange_by_angle()
+
+    assert [p.id_scan for p in expt._projections] == [1, 2, 0]
+    assert [p._id_angle for p in expt._projections] == [-10.0, 20.0, 30.0]
+
+
+def test_arrange_by_angle_with_extra_angles(caplog):
+    expt = _expt_with_angles(2, [30.0, -10.0, 20.0], sort_by_angle=True)
+    expt._arrange_by_angle()
+
+    # the extra angle is ignored with a warning
+    assert [p._id_angle for p in expt._projections] == [-10.0, 30.0]
+    assert "3 rotation angles for 2 projections" in caplog.text
+
+
+def test_arrange_by_angle_with_missing_angles():
+    expt = _expt_with_angles(3, [30.0, -10.0])
+
+    with pytest.raises(ValueError, match="2 rotation angles for 3 proj"):
+        expt._arrange_by_angle()